@@ -0,0 +1,271 @@
+"""
+Latency, response size and memory of the server callbacks on synthetic data.
+
+    python -m benchmarks.callbacks [--scales small medium large] [--repeat 50]
+    python -m benchmarks.callbacks --save      # record benchmarks/baselines/callbacks.json
+    python -m benchmarks.callbacks --compare   # exit 1 if a result regressed
+
+Latencies depend on the machine: the baseline is not versioned, record it with
+`--save` on the machine where you compare.
+
+Server callbacks are called directly (without the Flask request), on datasets
+generated with the schemas of the product tables and scaled in territories, years
+and education levels. Every other territory is selected, up to `--selected`
+territories (rendering the charts of a territory does not depend on the scale).
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import replace
+from pathlib import Path
+
+from dash import Dash, html
+from plotly.io.json import to_json_plotly
+
+from benchmarks.synthetic import make_dataset
+from dataviz_app import id, selection
+from dataviz_app.cube import ALL_YEARS
+from dataviz_app.component.country_charts import country_charts
+from dataviz_app.component.overall_view import overall_view
+from dataviz_app.component.pacific_map import pacific_map_callbacks
+from dataviz_app.prerender import PrerenderedBlocks, build
+from dataviz_app.registry import DataRegistry, DataVersion
+
+BASELINE = Path(__file__).parent / "baselines" / "callbacks.json"
+
+# territories, years, education levels
+SCALES = {
+    "small": (13, 10, 8),
+    "medium": (50, 20, 12),
+    "large": (200, 30, 16),
+}
+
+CALLBACKS = {
+    "update_content": f"{id.PACIFIC_MAP}.figure",
+    "country_charts": f"{id.CHART}.children",
+    "overall_view": f"{id.OVERALL_VIEW}.children",
+}
+
+# Latency differences below this are noise, whatever the tolerance.
+LATENCY_SLACK_MS = 1.0
+
+# Scenarios building new blocks before each call: fewer repetitions.
+SLOW = {
+    "country_charts (cold)",
+    "country_charts (cold, prerendered)",
+    "country_charts (cold, lazy)",
+    "country_charts (add one)",
+    "country_charts (one year)",
+}
+
+
+def registered_callbacks(register) -> dict:
+    """
+    Output -> function decorated by @callback, without Dash's request handling,
+    for the server callbacks `register()` declares.
+    """
+    app = Dash(__name__)
+    register()
+    app.layout = html.Div()
+    # Dash adds the callbacks declared with @callback to the app on its first request.
+    app.server.test_client().get(
+        f"{app.config.routes_pathname_prefix}_dash-dependencies"
+    )
+    return {
+        output: entry["callback"].__wrapped__
+        for output, entry in app.callback_map.items()
+        # Clientside callbacks have no server function.
+        if "callback" in entry
+    }
+
+
+def _registry(version: DataVersion) -> DataRegistry:
+    # Never reloaded: the dataset is not read from files.
+    return DataRegistry(version=version, interval=0)
+
+
+def scenarios(dataset, selected: int, prerender_dir: Path) -> dict:
+    """Name -> function returning the call to measure (called before each call)."""
+    version = DataVersion.of(dataset)
+    blocks_dir = build(version.query, version.key, prerender_dir, "synthetic")
+    prerendered = replace(version, prerendered=PrerenderedBlocks(blocks_dir).get)
+    registry = _registry(version)
+
+    def register():
+        pacific_map_callbacks(registry)
+        country_charts(registry, id_out=id.CHART, storage=id.STORE)
+        overall_view(registry)
+
+    registered = registered_callbacks(register)
+    callbacks = {name: registered[output] for name, output in CALLBACKS.items()}
+
+    territories = list(dataset.territories["pacific_island"])
+    # Store content: every other territory of the map order.
+    chosen = territories[::2][:selected]
+    store = selection.encode(territories, chosen, version.order)
+    one_more = selection.encode(territories, [*chosen, territories[1]], version.order)
+    blocks = [
+        {
+            "type": id.TERRITORY_BLOCK,
+            "index": territory,
+            "year": ALL_YEARS,
+            "version": version.key,
+        }
+        for territory in chosen
+    ]
+    year = dataset.cube.years[-1]
+
+    def cold_charts(version=None, lazy=False):
+        # A new component (and version) has empty caches of territory blocks.
+        version = version or DataVersion.of(dataset)
+        registered = registered_callbacks(
+            lambda: country_charts(
+                _registry(version), id_out=id.CHART, storage=id.STORE, lazy=lazy
+            )
+        )
+        return registered[CALLBACKS["country_charts"]]
+
+    def cold():
+        charts = cold_charts()
+        return lambda: charts(store, ALL_YEARS, [])
+
+    def cold_prerendered():
+        charts = cold_charts(replace(prerendered, query=DataVersion.of(dataset).query))
+        return lambda: charts(store, ALL_YEARS, [])
+
+    def cold_lazy():
+        # Placeholders only: the charts of each block are requested on scroll.
+        charts = cold_charts(lazy=True)
+        return lambda: charts(store, ALL_YEARS, [])
+
+    def add_one():
+        charts = cold_charts()
+        charts(store, ALL_YEARS, [])
+        return lambda: charts(one_more, ALL_YEARS, blocks)
+
+    def one_year():
+        # Blocks of the last year, sliced from the cube by the first call.
+        charts = cold_charts()
+        return lambda: charts(store, year, blocks)
+
+    cached = callbacks["country_charts"]
+    cached(store, ALL_YEARS, [])
+    overall = callbacks["overall_view"]
+    overall(store, year)
+
+    return {
+        "update_content": lambda: lambda: callbacks["update_content"](store),
+        "country_charts (cold)": cold,
+        "country_charts (cold, prerendered)": cold_prerendered,
+        "country_charts (cold, lazy)": cold_lazy,
+        "country_charts (cached)": lambda: lambda: cached(store, ALL_YEARS, []),
+        "country_charts (add one)": add_one,
+        "country_charts (one year)": one_year,
+        "overall_view": lambda: lambda: overall(store, ALL_YEARS),
+        "overall_view (one year)": lambda: lambda: overall(store, year),
+    }
+
+
+def measure(prepare, repeat: int) -> dict:
+    durations = []
+    for _ in range(repeat):
+        call = prepare()
+        tic = time.perf_counter()
+        result = call()
+        durations.append(time.perf_counter() - tic)
+
+    call = prepare()
+    tracemalloc.start()
+    call()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    quantiles = statistics.quantiles(durations, n=100, method="inclusive")
+    return {
+        "p50_ms": quantiles[49] * 1000,
+        "p95_ms": quantiles[94] * 1000,
+        "p99_ms": quantiles[98] * 1000,
+        "bytes": len(to_json_plotly(result).encode()),
+        "peak_kib": peak / 1024,
+    }
+
+
+def run(scales: list[str], repeat: int, selected: int) -> dict:
+    results = {}
+    for scale in scales:
+        territories, years, levels = SCALES[scale]
+        dataset = make_dataset(territories, years, levels)
+        with tempfile.TemporaryDirectory() as prerender_dir:
+            for name, prepare in scenarios(dataset, selected, prerender_dir).items():
+                count = max(repeat // 10, 3) if name in SLOW else repeat
+                results[f"{scale}/{name}"] = measure(prepare, count)
+    return results
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    regressions = []
+    for key, result in results.items():
+        if key not in baseline:
+            continue
+        for metric, slack in [("p50_ms", LATENCY_SLACK_MS), ("bytes", 0)]:
+            if result[metric] > baseline[key][metric] * (1 + tolerance) + slack:
+                regressions.append(
+                    f"{key} {metric}: {result[metric]:.2f} "
+                    f"(baseline {baseline[key][metric]:.2f})"
+                )
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--scales", nargs="+", choices=SCALES, default=["small", "medium"]
+    )
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--selected", type=int, default=6)
+    parser.add_argument("--save", action="store_true", help=f"Write {BASELINE}.")
+    parser.add_argument(
+        "--compare", action="store_true", help=f"Compare to {BASELINE}."
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.5,
+        help="Relative increase of p50 latency or size reported as a regression.",
+    )
+    args = parser.parse_args()
+    if args.compare and not BASELINE.exists():
+        parser.error(f"no baseline to compare to: record {BASELINE} with --save")
+
+    results = run(args.scales, args.repeat, args.selected)
+
+    print(
+        f"{'callback':<44} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+        f"{'bytes':>9} {'peak KiB':>9}"
+    )
+    for key, r in results.items():
+        print(
+            f"{key:<44} {r['p50_ms']:>8.2f} {r['p95_ms']:>8.2f} {r['p99_ms']:>8.2f} "
+            f"{r['bytes']:>9} {r['peak_kib']:>9.0f}"
+        )
+
+    if args.save:
+        BASELINE.parent.mkdir(exist_ok=True)
+        saved = json.loads(BASELINE.read_text()) if BASELINE.exists() else {}
+        BASELINE.write_text(json.dumps({**saved, **results}, indent=2) + "\n")
+
+    if args.compare:
+        regressions = compare(results, json.loads(BASELINE.read_text()), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,64 @@
+"""
+Cold start of a worker: time and memory to import the application.
+
+    python -m benchmarks.cold_start [--repeat 5]
+
+Each run imports `dataviz_app.app` in a new interpreter, as a gunicorn worker
+does, and reports the import time, the total time of the process, its peak RSS
+and which geospatial modules ended up imported.
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+from dataviz_app import config
+
+GEO_MODULES = ["geopandas", "shapely", "pyogrio", "fiona", "pyproj"]
+
+CHILD = f"""
+import json, resource, sys, time
+tic = time.perf_counter()
+import dataviz_app.app
+seconds = time.perf_counter() - tic
+print(json.dumps({{
+    "import_seconds": seconds,
+    "max_rss_kib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    "geo_modules": [m for m in {GEO_MODULES!r} if m in sys.modules],
+}}))
+"""
+
+
+def cold_start() -> dict:
+    tic = time.perf_counter()
+    output = subprocess.run(
+        [sys.executable, "-c", CHILD],
+        cwd=config.ROOT_DIR,
+        capture_output=True,
+        check=True,
+        text=True,
+    ).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    result["process_seconds"] = time.perf_counter() - tic
+    return result
+
+
+def main(repeat: int) -> None:
+    runs = [cold_start() for _ in range(repeat)]
+    import_seconds = statistics.median(r["import_seconds"] for r in runs)
+    process_seconds = statistics.median(r["process_seconds"] for r in runs)
+    max_rss = statistics.median(r["max_rss_kib"] for r in runs) / 1024
+
+    print(f"import dataviz_app.app  {import_seconds * 1000:>8.0f} ms (median)")
+    print(f"whole process           {process_seconds * 1000:>8.0f} ms (median)")
+    print(f"peak RSS                {max_rss:>8.1f} MiB (median)")
+    print(f"geospatial modules      {', '.join(runs[0]['geo_modules']) or 'none'}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    main(parser.parse_args().repeat)
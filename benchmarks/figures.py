@@ -0,0 +1,78 @@
+"""
+Compare building a territory chart from scratch to filling its prebuilt skeleton.
+
+    python -m benchmarks.figures [--repeat 100]
+
+`from scratch` runs plotly express / make_subplots and the styling of the chart,
+`skeleton` copies the figure built once and only sets its data arrays. Both
+include the JSON serialization of the figure.
+"""
+
+import argparse
+import statistics
+import time
+
+from plotly.io.json import to_json_plotly
+
+from dataviz_app.component import charts
+from dataviz_app.component.charts import bar, indicators, pie
+from dataviz_app.data import load_app_data
+from dataviz_app.territory_index import TerritoryIndex
+
+
+def measure(build, repeat: int) -> list:
+    durations = []
+    for _ in range(repeat):
+        tic = time.perf_counter()
+        to_json_plotly(build())
+        durations.append(time.perf_counter() - tic)
+    return durations
+
+
+def main(repeat: int) -> None:
+    app_data = load_app_data()
+    tables = {
+        "education": app_data.education,
+        "unemployed": app_data.unemployed,
+        "alphabetisation": app_data.alphabetisation,
+    }
+    territory_index = TerritoryIndex(
+        tables, territories=app_data.territories["pacific_island"]
+    )
+    # A territory with the three charts.
+    territory = next(
+        t
+        for t in territory_index.territories
+        if all(len(territory_index.positions(table, t)) for table in tables)
+    )
+    education = territory_index.take("education", territory)
+    unemployed = territory_index.take("unemployed", territory)
+    alphabetisation = territory_index.take("alphabetisation", territory)
+    men, women = alphabetisation[["Homme", "Femme"]].iloc[0]
+
+    print(f"{'chart':<12} {'mode':<13} {'median ms':>10} {'p95 ms':>8}")
+    for name, skeleton, render in [
+        ("bar", bar._skeleton, lambda: charts.education_bar(education)),
+        ("pie", pie._skeleton, lambda: charts.unemployed_pie(unemployed)),
+        (
+            "indicators",
+            indicators._skeleton,
+            lambda: charts.alphabetisation_indicators(men=men, women=women),
+        ),
+    ]:
+
+        def from_scratch():
+            skeleton.cache_clear()
+            return render()
+
+        for mode, build in [("from scratch", from_scratch), ("skeleton", render)]:
+            durations = measure(build, repeat)
+            median = statistics.median(durations) * 1000
+            p95 = statistics.quantiles(durations, n=20)[-1] * 1000
+            print(f"{name:<12} {mode:<13} {median:>10.2f} {p95:>8.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=100)
+    main(parser.parse_args().repeat)
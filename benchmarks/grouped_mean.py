@@ -0,0 +1,111 @@
+"""
+Check the means of `GroupedMean` against a filter and a `groupby`.
+
+    python -m benchmarks.grouped_mean [--selections 400] [--seed 0]
+
+For each table of the overall view, the mean over every single territory and
+random selections of territories is compared with
+`frame[frame[TERRITORY].isin(selection)].groupby(keys, observed=False)[values].mean()`,
+on the application data and once again with some keys missing. Exits 1 if a
+result differs.
+"""
+
+import argparse
+import sys
+
+import numpy as np
+import pandas as pd
+
+from dataviz_app.aggregation import GroupedMean
+from dataviz_app.data import load_app_data
+from dataviz_app.territory_index import TERRITORY, TerritoryIndex
+
+# Table -> keys and values of the overall view.
+MEANS = {
+    "education": (["Niveau d'éducation", "Genre"], ["Ratio"]),
+    "unemployed": (["Sexe"], ["Pourcentage"]),
+    "alphabetisation": ([], ["Homme", "Femme"]),
+}
+
+
+def expected(frame: pd.DataFrame, keys: list[str], values: list[str], selection):
+    selected = frame[frame[TERRITORY].isin(selection)]
+    if not keys:
+        return selected[values].mean().to_frame().T
+    return selected.groupby(keys, observed=False)[values].mean().reset_index()
+
+
+def matches(result: pd.DataFrame, reference: pd.DataFrame, values: list[str]) -> bool:
+    if reference[values].isna().all(axis=None):
+        # No value in the selection: no rows to chart.
+        return result.empty
+    try:
+        pd.testing.assert_frame_equal(
+            result.reset_index(drop=True),
+            reference.reset_index(drop=True),
+            check_dtype=False,
+            check_names=False,
+        )
+    except AssertionError:
+        return False
+    return True
+
+
+def with_missing_keys(tables: dict) -> dict:
+    # Every 7th row loses its first key: groupby leaves it out of every group.
+    result = {}
+    for table, frame in tables.items():
+        keys, _ = MEANS[table]
+        frame = frame.copy()
+        if keys:
+            frame.loc[frame.index[::7], keys[0]] = np.nan
+        result[table] = frame
+    return result
+
+
+def check(tables: dict, territories: list[str], selections: int, rng) -> int:
+    index = TerritoryIndex(tables, territories=territories)
+    names = list(index.territories)
+    samples = [[t] for t in names] + [
+        list(rng.choice(names, size=rng.integers(2, len(names) + 1), replace=False))
+        for _ in range(selections)
+    ]
+
+    failures = 0
+    for table, (keys, values) in MEANS.items():
+        mean = GroupedMean(index, table, keys, values)
+        for selection in samples:
+            reference = expected(tables[table], keys, values, selection)
+            if not matches(mean.mean(selection), reference, values):
+                failures += 1
+                print(f"{table}: different mean for {selection}")
+    return failures
+
+
+def main(selections: int, seed: int) -> int:
+    app_data = load_app_data()
+    tables = {
+        "education": app_data.education,
+        "unemployed": app_data.unemployed,
+        "alphabetisation": app_data.alphabetisation,
+    }
+    territories = list(app_data.territories["pacific_island"])
+    rng = np.random.default_rng(seed)
+
+    failures = 0
+    for name, data in [
+        ("application data", tables),
+        ("missing keys", with_missing_keys(tables)),
+    ]:
+        found = check(data, territories, selections, rng)
+        print(f"{name:<18} {'ok' if not found else f'{found} differences'}")
+        failures += found
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--selections", type=int, default=400)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    sys.exit(main(args.selections, args.seed))
@@ -0,0 +1,380 @@
+"""
+Throughput and latency of the server under concurrent users replaying sessions.
+
+    python -m benchmarks.load_test [--users 1 5 10] [--duration 20] [--think 0.5]
+    python -m benchmarks.load_test --gunicorn --workers 4 --users 10 20 40
+
+Every user is a thread replaying sessions as a browser would. It loads the page,
+clicks a few territories on the map, opens the overall view, picks a year,
+switches the language and unselects a territory. For each change of the page,
+it sends the `_dash-update-component` requests of the server callbacks this
+change triggers, at once and with the inputs and states the renderer would
+send. The selection store is toggled as the clientside callback of the map does,
+and the territory blocks on the page are followed through the chart responses
+(lists or patches). Opening the overall view and switching the language are
+clientside callbacks: they send no request. Lazy blocks (`DATAVIZ_LAZY_CHARTS`)
+request their charts for the first `--viewport` new blocks, and background
+callbacks (`DATAVIZ_BACKGROUND_CHARTS`) are polled until they answer.
+
+The server is `dataviz_app.app:server`, called in this process through its test
+client (the threads share one interpreter, like one threaded worker), or a
+local gunicorn started with gunicorn.conf.py (`--gunicorn`). Each number of
+users runs for `--duration` seconds. Reports, for each callback and page
+request, the throughput, the p50/p95/p99 latencies and the error rate.
+"""
+
+import argparse
+import http.client
+import json
+import random
+import statistics
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.server import free_port, start_gunicorn, stop
+from dataviz_app import id, selection
+from dataviz_app.cube import ALL_YEARS
+
+UPDATE = "/_dash-update-component"
+PAGE = ["/", "/_dash-layout", "/_dash-dependencies"]
+# Requests a browser sends at once to the same host.
+BROWSER_CONNECTIONS = 6
+
+
+class InProcess:
+    """The Flask application of this process (one test client per thread)."""
+
+    def __init__(self):
+        from dataviz_app.app import server
+
+        self.server = server
+        self.local = threading.local()
+
+    def request(self, method: str, path: str, body: dict = None) -> tuple[int, bytes]:
+        if not hasattr(self.local, "client"):
+            self.local.client = self.server.test_client()
+        response = self.local.client.open(path, method=method, json=body)
+        return response.status_code, response.get_data()
+
+    def close(self) -> None:
+        pass
+
+
+class Gunicorn:
+    """A local gunicorn (one keep-alive connection per thread)."""
+
+    def __init__(self, workers: int):
+        self.port = free_port()
+        self.local = threading.local()
+        self.process = start_gunicorn(self.port, workers)
+
+    def request(self, method: str, path: str, body: dict = None) -> tuple[int, bytes]:
+        if not hasattr(self.local, "connection"):
+            self.local.connection = http.client.HTTPConnection(
+                "127.0.0.1", self.port, timeout=120
+            )
+        connection = self.local.connection
+        data = None if body is None else json.dumps(body).encode()
+        headers = {} if body is None else {"Content-Type": "application/json"}
+        try:
+            connection.request(method, path, body=data, headers=headers)
+            response = connection.getresponse()
+            return response.status, response.read()
+        except (OSError, http.client.HTTPException):
+            connection.close()
+            raise
+
+    def close(self) -> None:
+        stop(self.process)
+
+
+class Stats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    def record(self, name: str, seconds: float, ok: bool) -> None:
+        with self.lock:
+            self.latencies[name].append(seconds)
+            if not ok:
+                self.errors[name] += 1
+
+
+def _find(node, component_id: str) -> dict | None:
+    """Props of the component `component_id` of a layout."""
+    if isinstance(node, list):
+        for child in node:
+            found = _find(child, component_id)
+            if found is not None:
+                return found
+    elif isinstance(node, dict) and "props" in node:
+        props = node["props"]
+        if props.get("id") == component_id:
+            return props
+        return _find(props.get("children"), component_id)
+    return None
+
+
+def _prop(dependency: dict) -> str:
+    return f"{dependency['id']}.{dependency['property']}"
+
+
+class Application:
+    """What the sessions need from the layout and the callbacks of the server."""
+
+    def __init__(self, transport):
+        layout = json.loads(transport.request("GET", "/_dash-layout")[1])
+        dependencies = json.loads(transport.request("GET", "/_dash-dependencies")[1])
+        figure = _find(layout, id.PACIFIC_MAP)["figure"]
+        # Map order of the territories, and its key sent in the store.
+        self.order = figure["data"][0]["locations"]
+        self.key = _find(layout, id.STORE)["data"]["order"]
+        years = [option["value"] for option in _find(layout, id.YEAR)["options"]]
+        self.years = [year for year in years if year != ALL_YEARS]
+
+        server = [d for d in dependencies if not d.get("clientside_function")]
+        self.lazy = next(
+            (d for d in server if id.TERRITORY_CHARTS in d["output"]), None
+        )
+        self.callbacks = [d for d in server if d is not self.lazy]
+
+
+def session(rng: random.Random, app: Application) -> list[tuple]:
+    clicked = rng.sample(range(len(app.order)), rng.randint(2, 6))
+    steps = [("click", position) for position in clicked]
+    steps.append(("overall view",))
+    if app.years:
+        steps.append(("year", rng.choice(app.years)))
+    steps.append(("language",))
+    steps.append(("click", clicked[0]))
+    return steps
+
+
+class Page:
+    """One page of a browser: the props read by the callbacks, and the blocks."""
+
+    def __init__(self, transport, app: Application, stats: Stats, pool, viewport: int):
+        self.transport = transport
+        self.app = app
+        self.stats = stats
+        self.pool = pool
+        self.viewport = viewport
+        self.selected = set()
+        self.props = {
+            f"{id.STORE}.data": selection.empty(app.key),
+            f"{id.YEAR}.value": ALL_YEARS,
+        }
+        self.blocks = []
+
+    def load(self) -> None:
+        for path in PAGE:
+            self._send(f"GET {path}", "GET", path)
+        self._fire(
+            [d for d in self.app.callbacks if not d.get("prevent_initial_call")], None
+        )
+
+    def step(self, action: str, *args) -> None:
+        if action == "click":
+            (position,) = args
+            self.selected ^= {self.app.order[position]}
+            store = selection.encode(self.app.order, self.selected, self.app.key)
+            self._change(f"{id.STORE}.data", store)
+        elif action == "year":
+            self._change(f"{id.YEAR}.value", args[0])
+        # Other actions only run clientside callbacks.
+
+    def _change(self, prop: str, value) -> None:
+        self.props[prop] = value
+        triggered = [d for d in self.app.callbacks if prop in map(_prop, d["inputs"])]
+        self._fire(triggered, prop)
+
+    def _fire(self, callbacks: list[dict], changed: str | None) -> None:
+        # Sent at once, as the renderer does.
+        results = list(self.pool.map(lambda d: (d, self._call(d, changed)), callbacks))
+        for dependency, response in results:
+            if dependency["output"] == f"{id.CHART}.children" and response:
+                added = self._update_blocks(response["response"][id.CHART]["children"])
+                if self.app.lazy is not None:
+                    self._fire_lazy(added[: self.viewport])
+
+    def _update_blocks(self, children) -> list[dict]:
+        before = list(self.blocks)
+        if children is None:
+            self.blocks = []
+        elif isinstance(children, list):
+            # The first child is a spacer.
+            self.blocks = [child["props"]["id"] for child in children[1:]]
+        else:
+            for operation in children["operations"]:
+                if operation["operation"] == "Insert":
+                    block = operation["params"]["value"]["props"]["id"]
+                    self.blocks.insert(operation["params"]["index"] - 1, block)
+                elif operation["operation"] == "Delete":
+                    del self.blocks[operation["location"][0] - 1]
+        return [block for block in self.blocks if block not in before]
+
+    def _fire_lazy(self, blocks: list[dict]) -> None:
+        def show(block):
+            charts = {**block, "type": id.TERRITORY_CHARTS}
+            visible = {**block, "type": id.TERRITORY_VISIBLE}
+            body = {
+                "output": self.app.lazy["output"],
+                "outputs": {"id": charts, "property": "children"},
+                "inputs": [{"id": visible, "property": "data", "value": True}],
+                "changedPropIds": [
+                    json.dumps(visible, sort_keys=True, separators=(",", ":")) + ".data"
+                ],
+            }
+            self._post("territory charts (lazy)", body)
+
+        list(self.pool.map(show, blocks))
+
+    def _state(self, dependency: dict) -> dict | list:
+        if dependency["id"].startswith("{"):
+            # Pattern-matching state: the territory blocks on the page.
+            return [
+                {"id": block, "property": dependency["property"], "value": block}
+                for block in self.blocks
+            ]
+        return {**dependency, "value": self.props.get(_prop(dependency))}
+
+    def _call(self, dependency: dict, changed: str | None) -> dict | None:
+        component, prop = dependency["output"].rsplit(".", 1)
+        body = {
+            "output": dependency["output"],
+            "outputs": {"id": component, "property": prop},
+            "inputs": [
+                {**i, "value": self.props.get(_prop(i))} for i in dependency["inputs"]
+            ],
+            "state": [self._state(s) for s in dependency["state"]],
+            "changedPropIds": [changed] if changed else [],
+        }
+        return self._post(dependency["output"], body, dependency.get("long"))
+
+    def _post(self, name: str, body: dict, background: dict = None) -> dict | None:
+        """Response of a callback, None if nothing changed or it failed."""
+        tic = time.perf_counter()
+        try:
+            status, content = self.transport.request("POST", UPDATE, body)
+            response = json.loads(content) if status == 200 else None
+            if background and response and "job" in response:
+                # A background job: polled until it answers (or is cancelled).
+                path = f"{UPDATE}?cacheKey={response['cacheKey']}&job={response['job']}"
+                while status == 200 and "response" not in response:
+                    time.sleep(background["interval"] / 1000)
+                    status, content = self.transport.request("POST", path, body)
+                    response = json.loads(content) if status == 200 else None
+        except (OSError, http.client.HTTPException, ValueError):
+            self.stats.record(name, time.perf_counter() - tic, False)
+            return None
+        self.stats.record(name, time.perf_counter() - tic, status < 400)
+        return response if status == 200 else None
+
+    def _send(self, name: str, method: str, path: str) -> None:
+        tic = time.perf_counter()
+        try:
+            status, _ = self.transport.request(method, path)
+        except (OSError, http.client.HTTPException):
+            status = 599
+        self.stats.record(name, time.perf_counter() - tic, status < 400)
+
+
+def user(transport, app, stats, pool, seed, deadline, think, viewport) -> int:
+    """Replays sessions until `deadline`; returns the number of sessions done."""
+    rng = random.Random(seed)
+    sessions = 0
+    while time.monotonic() < deadline:
+        page = Page(transport, app, stats, pool, viewport)
+        page.load()
+        for step in session(rng, app):
+            if time.monotonic() >= deadline:
+                return sessions
+            if think:
+                time.sleep(rng.expovariate(1 / think))
+            page.step(*step)
+        sessions += 1
+    return sessions
+
+
+def _percentiles(latencies: list[float]) -> tuple[float, float, float]:
+    if len(latencies) == 1:
+        return latencies * 3
+    q = statistics.quantiles(latencies, n=100, method="inclusive")
+    return q[49], q[94], q[98]
+
+
+def run(transport, app, users, duration, think, viewport, seed) -> tuple:
+    """Stats, sessions completed and elapsed seconds of `users` concurrent users."""
+    stats = Stats()
+    # Every user is a browser, with its own connections.
+    pools = [ThreadPoolExecutor(BROWSER_CONNECTIONS) for _ in range(users)]
+    tic = time.perf_counter()
+    deadline = time.monotonic() + duration
+    with ThreadPoolExecutor(users) as runner:
+        futures = [
+            runner.submit(
+                user, transport, app, stats, pool, seed + n, deadline, think, viewport
+            )
+            for n, pool in enumerate(pools)
+        ]
+        sessions = sum(future.result() for future in futures)
+    elapsed = time.perf_counter() - tic
+    for pool in pools:
+        pool.shutdown()
+    return stats, sessions, elapsed
+
+
+def report(users: int, stats: Stats, sessions: int, elapsed: float) -> None:
+    rows = sorted(stats.latencies.items())
+    rows.append(("all", [s for _, latencies in rows for s in latencies]))
+    errors = dict(stats.errors, all=sum(stats.errors.values()))
+    for name, latencies in rows:
+        if not latencies:
+            continue
+        p50, p95, p99 = (1000 * s for s in _percentiles(latencies))
+        print(
+            f"{users:>5} {name:<36} {len(latencies):>8} "
+            f"{len(latencies) / elapsed:>7.1f} {p50:>8.1f} {p95:>8.1f} {p99:>8.1f} "
+            f"{100 * errors.get(name, 0) / len(latencies):>7.1f}"
+        )
+    print(f"{users:>5} ({sessions} sessions completed in {elapsed:.1f} s)")
+
+
+def main(args) -> None:
+    transport = Gunicorn(args.workers) if args.gunicorn else InProcess()
+    try:
+        app = Application(transport)
+        print(
+            f"{'users':>5} {'callback / request':<36} {'requests':>8} {'req/s':>7} "
+            f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors%':>7}"
+        )
+        for users in args.users:
+            stats, sessions, elapsed = run(
+                transport,
+                app,
+                users,
+                args.duration,
+                args.think,
+                args.viewport,
+                args.seed,
+            )
+            report(users, stats, sessions, elapsed)
+    finally:
+        transport.close()
+    server = f"gunicorn, {args.workers} workers" if args.gunicorn else "in-process"
+    print(f"({server}; latencies of background callbacks include their polling)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, nargs="+", default=[1, 5, 10])
+    parser.add_argument("--duration", type=float, default=20, help="seconds per step")
+    parser.add_argument("--think", type=float, default=0.5, help="mean pause, s")
+    parser.add_argument("--viewport", type=int, default=2, help="lazy blocks shown")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--gunicorn", action="store_true")
+    parser.add_argument("--workers", type=int, default=4)
+    main(parser.parse_args())
@@ -0,0 +1,110 @@
+"""
+Compare the map update sent after a click on a territory.
+
+    python -m benchmarks.map_selection [--repeat 200]
+
+`before` is the update of the original application: the store maps every
+territory to a boolean, and the callback rebuilds the whole `px.choropleth`
+(geometry and one trace per color included) and serializes it. `patch` only
+sends the new selection array.
+"""
+
+import argparse
+import statistics
+import time
+
+import geopandas as gpd
+import pandas as pd
+import plotly.express as px
+from plotly.io.json import to_json_plotly
+
+from dataviz_app import config
+from dataviz_app.component.pacific_map import _helper_pacific_map_patch
+from dataviz_app.data import load_app_data
+from dataviz_app.geometry import SOURCE
+
+
+def _baseline_pacific_map(pacific_eez: gpd.GeoDataFrame, selected: pd.Series):
+    # _helper_pacific_map of the original application, unchanged.
+    data = pacific_eez.set_index("pacific_island")
+    data["Selected"] = selected
+    data = data.rename(columns={"ile_du_pacifique": "Nom français"})
+    # rename index
+    data.index.name = "English name"
+
+    figure = px.choropleth(
+        data_frame=data,
+        geojson=data.geometry,
+        locations=data.index,
+        color="Selected",
+        color_discrete_map={False: "grey", True: "#433279"},
+        hover_data={"Nom français": True, "Selected": False},
+    )
+    figure.update_traces(marker_opacity=0.5)
+    figure.update_geos(
+        projection=dict(type="natural earth", scale=1, rotation=dict(lon=180)),
+        bgcolor="rgba(0,0,0,0)",
+        oceancolor="#4878AD",
+        landcolor="#F6BA45",
+        lakecolor="#4878AD",
+        showland=True,
+        showlakes=True,
+        showocean=True,
+        showcoastlines=True,
+    )
+    figure.update_layout(
+        showlegend=False,
+        margin=dict(l=0, r=0, t=0, b=0, pad=0, autoexpand=False),
+        paper_bgcolor="rgba(0,0,0,0)",
+        plot_bgcolor="rgba(0,0,0,0)",
+    )
+
+    return figure
+
+
+def measure(build, stores) -> tuple[list, int]:
+    durations = []
+    size = 0
+    for store in stores:
+        tic = time.perf_counter()
+        payload = to_json_plotly(build(store))
+        durations.append(time.perf_counter() - tic)
+        size = len(payload.encode())
+    return durations, size
+
+
+def main(repeat: int) -> None:
+    app_data = load_app_data()
+    # The geometry read by the original application.
+    pacific_eez = gpd.read_file(config.DATA_DIR / SOURCE).drop(columns=["index"])
+    territories = list(pacific_eez["pacific_island"])
+    # Toggle territories one after the other, as a user clicking on the map.
+    selections = [list(range(i % len(territories) + 1)) for i in range(repeat)]
+
+    print(f"{'mode':<12} {'bytes':>9} {'median ms':>10} {'p95 ms':>8}")
+    for name, build, stores in [
+        (
+            "before",
+            # update_content of the original application.
+            lambda store: _baseline_pacific_map(pacific_eez, pd.Series(store)),
+            [
+                {t: i in selected for i, t in enumerate(territories)}
+                for selected in selections
+            ],
+        ),
+        (
+            "patch",
+            lambda selected: _helper_pacific_map_patch(app_data.territories, selected),
+            selections,
+        ),
+    ]:
+        durations, size = measure(build, stores)
+        median = statistics.median(durations) * 1000
+        p95 = statistics.quantiles(durations, n=20)[-1] * 1000
+        print(f"{name:<12} {size:>9} {median:>10.2f} {p95:>8.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=200)
+    main(parser.parse_args().repeat)
@@ -0,0 +1,61 @@
+"""
+Local gunicorn servers for the benchmarks.
+
+`start_gunicorn` runs `dataviz_app.app:server` with gunicorn.conf.py on a local
+port, as in production, and returns once it answers.
+"""
+
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+
+from dataviz_app import config
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_ready(url: str, timeout: float = 120) -> None:
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            with urllib.request.urlopen(url, timeout=5):
+                return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.2)
+
+
+def start_gunicorn(port: int, workers: int, env: dict = None) -> subprocess.Popen:
+    """Gunicorn on 127.0.0.1:`port`, with `env` added to the environment."""
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            *("-m", "gunicorn", "-c", "gunicorn.conf.py"),
+            *("--bind", f"127.0.0.1:{port}", "--workers", str(workers)),
+            "dataviz_app.app:server",
+        ],
+        cwd=config.ROOT_DIR,
+        env={**os.environ, **(env or {})},
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        wait_ready(f"http://127.0.0.1:{port}/")
+    except OSError:
+        stop(server)
+        raise
+    return server
+
+
+def stop(server: subprocess.Popen) -> None:
+    server.send_signal(signal.SIGTERM)
+    server.wait(timeout=30)
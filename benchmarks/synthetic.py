@@ -0,0 +1,102 @@
+"""
+Synthetic datasets with the schemas of the application data.
+
+Clean tables are generated with one row per territory, sex and year, then go
+through the production functions of the pipeline, so the product tables have
+the exact schema (columns, dtypes and categories) the application reads, and so
+does the year cube.
+"""
+
+import numpy as np
+import pandas as pd
+
+from dataviz_app.cube import YearCube
+from dataviz_app.data import AppData
+from dataviz_app.pipeline import product
+from dataviz_app.territory_index import TERRITORY
+
+SEXES = ["Femme", "Homme", "Total"]
+
+
+def territory_names(territories: int) -> list[str]:
+    return [f"Territory {i:03d}" for i in range(territories)]
+
+
+def education_levels(levels: int) -> dict[str, str]:
+    known = list(product.EDUCATION_LEVELS.items())[:levels]
+    extra = [(f"Niveau {i}", f"Niveau {i}") for i in range(len(known), levels)]
+    return dict(known + extra)
+
+
+def _frame(territories: list[str], years: int) -> pd.DataFrame:
+    index = pd.MultiIndex.from_product(
+        [territories, SEXES, range(2024 - years, 2024)],
+        names=[TERRITORY, "Sexe", "TIME_PERIOD"],
+    )
+    data = index.to_frame(index=False)
+    for column in [TERRITORY, "Sexe"]:
+        data[column] = data[column].astype("category")
+    return data
+
+
+def _geometry(territories: list[str], vertices: int) -> tuple[pd.DataFrame, dict]:
+    # Discs of `vertices` points on a grid over the Pacific.
+    side = int(np.ceil(np.sqrt(len(territories))))
+    angles = np.linspace(0, 2 * np.pi, max(vertices, 4))
+    features = []
+    for i, territory in enumerate(territories):
+        x = 130 + 100 * (i % side) / side + 25 / side * np.cos(angles)
+        y = -30 + 50 * (i // side) / side + 25 / side * np.sin(angles)
+        features.append(
+            {
+                "id": territory,
+                "type": "Feature",
+                "properties": {},
+                "geometry": {
+                    "type": "Polygon",
+                    "coordinates": [np.column_stack([x, y]).tolist()],
+                },
+            }
+        )
+    metadata = pd.DataFrame(
+        {
+            "pacific_island": territories,
+            "ile_du_pacifique": [f"{t} (fr)" for t in territories],
+        }
+    )
+    return metadata, {"type": "FeatureCollection", "features": features}
+
+
+def make_dataset(
+    territories: int = 13,
+    years: int = 10,
+    levels: int = 8,
+    vertices: int = 100,
+    seed: int = 0,
+) -> AppData:
+    rng = np.random.default_rng(seed)
+    names = territory_names(territories)
+    levels = education_levels(levels)
+
+    education = _frame(names, years)
+    for column in ["Âge", "Urbanisation", "Invalidité"]:
+        education[column] = pd.Categorical(["_T"] * len(education))
+    for level in levels:
+        education[level] = rng.integers(1, 1000, len(education)).astype(float)
+    education.columns.name = "Niveau d'éducation"
+
+    neet = _frame(names, years)
+    neet[product.NEET] = rng.integers(1, 5000, len(neet)).astype(float)
+
+    literacy = _frame(names, years)
+    literacy[product.LITERACY] = rng.uniform(60, 100, len(literacy))
+
+    territories, geojson = _geometry(names, vertices)
+    return AppData(
+        territories=territories,
+        geojson=geojson,
+        education=product.education_attainment(education, levels),
+        unemployed=product.unemployed(neet),
+        alphabetisation=product.alphabetisation(literacy),
+        cube=YearCube(product.year_cube(education, literacy, neet, levels)),
+    )
@@ -0,0 +1,69 @@
+"""
+Compare the size of the responses with the built-in and the pruned templates.
+
+    python -m benchmarks.templates [--territories 1 3 6]
+
+Sizes of the chart column rendered for the first territories of the map, and
+of the initial map figure, with `DATAVIZ_PRUNED_TEMPLATES` off and on.
+"""
+
+import argparse
+
+from plotly.io.json import to_json_plotly
+
+from benchmarks.callbacks import registered_callbacks
+from dataviz_app import config, id, selection
+from dataviz_app.cube import ALL_YEARS
+from dataviz_app.component.charts import bar, indicators, pie
+from dataviz_app.component.country_charts import country_charts
+from dataviz_app.component.pacific_map import _helper_pacific_map
+from dataviz_app.data import load_app_data
+from dataviz_app.registry import DataRegistry, DataVersion
+
+
+def sizes(app_data, version, counts: list[int]) -> dict:
+    for skeleton in [bar._skeleton, pie._skeleton, indicators._skeleton]:
+        skeleton.cache_clear()
+
+    # A new component, so that no block is cached with the other template.
+    registered = registered_callbacks(
+        lambda: country_charts(
+            DataRegistry(version=version), id_out=id.CHART, storage=id.STORE
+        )
+    )
+    update_charts = registered[f"{id.CHART}.children"]
+    territories = list(app_data.territories["pacific_island"])
+
+    result = {}
+    for count in counts:
+        store = selection.encode(territories, territories[:count], version.order)
+        result[f"chart column, {count} territories"] = len(
+            to_json_plotly(update_charts(store, ALL_YEARS, [])).encode()
+        )
+    result["map figure"] = len(
+        to_json_plotly(
+            _helper_pacific_map(app_data.territories, app_data.geojson, selected=[])
+        ).encode()
+    )
+    return result
+
+
+def main(counts: list[int]) -> None:
+    app_data = load_app_data()
+    version = DataVersion.of(app_data)
+
+    config.PRUNED_TEMPLATES = False
+    full = sizes(app_data, version, counts)
+    config.PRUNED_TEMPLATES = True
+    pruned = sizes(app_data, version, counts)
+
+    print(f"{'response':<30} {'built-in':>9} {'pruned':>9} {'saved':>7}")
+    for name in full:
+        saved = 1 - pruned[name] / full[name]
+        print(f"{name:<30} {full[name]:>9} {pruned[name]:>9} {saved:>7.0%}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--territories", type=int, nargs="+", default=[1, 3, 6])
+    main(parser.parse_args().territories)
@@ -0,0 +1,96 @@
+"""
+Memory of the gunicorn workers, with and without the shared serving mode.
+
+    python -m benchmarks.workers [--workers 4] [--requests 20]
+
+Starts gunicorn with gunicorn.conf.py on a local port, once with every worker
+importing the application and reading the parquet tables, once with the
+application preloaded by the master and the Arrow tables memory-mapped. After
+a few requests, reports for each worker its RSS, its PSS (shared pages divided
+between the processes sharing them) and its USS (pages of its own), and the
+total PSS of the server. Linux only (/proc/<pid>/smaps_rollup).
+"""
+
+import argparse
+import time
+import urllib.request
+from pathlib import Path
+
+from benchmarks.server import free_port, start_gunicorn, stop
+
+VARIANTS = {
+    "one copy per worker": {"DATAVIZ_PRELOAD": "0", "DATAVIZ_DATA_FORMAT": "parquet"},
+    "preload + arrow": {"DATAVIZ_PRELOAD": "1", "DATAVIZ_DATA_FORMAT": "arrow"},
+}
+
+
+def _children(pid: int) -> list[int]:
+    children = Path(f"/proc/{pid}/task/{pid}/children").read_text().split()
+    return [int(child) for child in children]
+
+
+def memory(pid: int) -> dict[str, int]:
+    """RSS, PSS and USS of a process, in KiB."""
+    fields = {}
+    for line in Path(f"/proc/{pid}/smaps_rollup").read_text().splitlines()[1:]:
+        name, value = line.split(":")
+        fields[name] = int(value.split()[0])
+    return {
+        "rss": fields["Rss"],
+        "pss": fields["Pss"],
+        "uss": fields["Private_Clean"] + fields["Private_Dirty"],
+    }
+
+
+def run(env: dict, workers: int, requests: int) -> dict:
+    port = free_port()
+    url = f"http://127.0.0.1:{port}"
+    tic = time.perf_counter()
+    server = start_gunicorn(port, workers, env)
+    try:
+        ready = time.perf_counter() - tic
+        for _ in range(requests):
+            for path in ["/", "/_dash-layout", "/_dash-dependencies"]:
+                urllib.request.urlopen(url + path, timeout=30).read()
+        # Every worker booted (they may not all have served a request).
+        while len(_children(server.pid)) < workers:
+            time.sleep(0.2)
+        time.sleep(1)
+        worker_memory = [memory(pid) for pid in _children(server.pid)]
+        master_memory = memory(server.pid)
+    finally:
+        stop(server)
+
+    def mean(key):
+        return sum(m[key] for m in worker_memory) / len(worker_memory) / 1024
+
+    return {
+        "ready_seconds": ready,
+        "rss": mean("rss"),
+        "pss": mean("pss"),
+        "uss": mean("uss"),
+        "total_pss": (master_memory["pss"] + sum(m["pss"] for m in worker_memory))
+        / 1024,
+    }
+
+
+def main(workers: int, requests: int) -> None:
+    print(
+        f"{'mode':<22} {'ready s':>8} {'RSS MiB':>8} {'PSS MiB':>8} {'USS MiB':>8} "
+        f"{'total PSS':>10}"
+    )
+    for name, env in VARIANTS.items():
+        r = run(env, workers, requests)
+        print(
+            f"{name:<22} {r['ready_seconds']:>8.2f} {r['rss']:>8.1f} {r['pss']:>8.1f} "
+            f"{r['uss']:>8.1f} {r['total_pss']:>10.1f}"
+        )
+    print(f"(per worker means, {workers} workers; total PSS includes the master)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--requests", type=int, default=20)
+    args = parser.parse_args()
+    main(args.workers, args.requests)
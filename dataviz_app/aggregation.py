@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+
+from dataviz_app.territory_index import TerritoryIndex
+
+
+class GroupedMean:
+    """
+    Mean of `values` grouped by `keys` over any selection of territories.
+
+    Sums and counts are computed once per territory and group, so the mean for a
+    selection is a masked reduction over two arrays instead of a filter and a
+    `groupby`. Results match `frame[selected].groupby(keys, observed=False)
+    [values].mean()`.
+    """
+
+    def __init__(
+        self,
+        territory_index: TerritoryIndex,
+        table: str,
+        keys: list[str],
+        values: list[str],
+    ):
+        self.territory_index = territory_index
+        self.keys = list(keys)
+        self.values = list(values)
+        frame = territory_index[table]
+
+        if self.keys:
+            index = frame.groupby(self.keys, observed=False)[self.values].mean().index
+            self.index = (
+                index
+                if isinstance(index, pd.MultiIndex)
+                else pd.MultiIndex.from_arrays([index], names=self.keys)
+            )
+            groups = index.get_indexer(frame.set_index(self.keys).index)
+        else:
+            self.index = None
+            groups = np.zeros(len(frame), dtype=int)
+
+        data = frame[self.values].to_numpy(dtype=float)
+        shape = (
+            len(territory_index.territories),
+            1 if self.index is None else len(self.index),
+        )
+        self.sums = np.zeros((*shape, len(self.values)))
+        self.counts = np.zeros((*shape, len(self.values)))
+        # Rows with a missing key are in no group (-1), as groupby drops them.
+        rows = groups >= 0
+        position = (territory_index.codes[table][rows], groups[rows])
+        np.add.at(self.sums, position, np.nan_to_num(data[rows]))
+        np.add.at(self.counts, position, ~np.isnan(data[rows]))
+
+    def mean(self, countries: list[str]) -> pd.DataFrame:
+        mask = self.territory_index.mask(countries)
+        sums = self.sums[mask].sum(axis=0)
+        counts = self.counts[mask].sum(axis=0)
+
+        if not counts.any():
+            return pd.DataFrame(columns=[*self.keys, *self.values])
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            means = np.where(counts > 0, sums / counts, np.nan)
+        result = pd.DataFrame(means, index=self.index, columns=self.values)
+        if self.index is None:
+            return result
+        return result[self._observed(counts.any(axis=1))].reset_index()
+
+    def _observed(self, selected: np.ndarray) -> np.ndarray:
+        # groupby(observed=False) keeps every category of the categorical keys,
+        # but only the values of the other keys found in the selection.
+        keep = np.ones(len(self.index), dtype=bool)
+        for level, codes in zip(self.index.levels, self.index.codes):
+            if isinstance(level.dtype, pd.CategoricalDtype):
+                continue
+            present = np.zeros(len(level), dtype=bool)
+            present[codes[selected]] = True
+            keep &= present[codes]
+        return keep
@@ -1,37 +1,59 @@
+import logging
+from dataclasses import replace
+from functools import lru_cache
+
 from dash import Dash, html, dcc
-import geopandas as gpd
-import pandas as pd
 import dash_bootstrap_components as dbc
 
 
-from dataviz_app import id
-from dataviz_app.component.pacific_map import pacific_map
+from dataviz_app import id, config, selection
+from dataviz_app.background import background_manager
+from dataviz_app.data import AppData
+from dataviz_app.metrics import instrument
+from dataviz_app.prerender import prerendered_blocks
+from dataviz_app.registry import DataRegistry, DataVersion
+from dataviz_app.component.pacific_map import pacific_map, pacific_map_callbacks
 from dataviz_app.component.country_charts import country_charts
 from dataviz_app.component.menu import menu
 from dataviz_app.component.arrow import animated_arrow
 from dataviz_app.component.overall_view import overall_view
+from dataviz_app.component.year_selector import year_selector
+
+logging.basicConfig(level=config.LOG_LEVEL, format="%(asctime)s %(name)s %(message)s")
+logger = logging.getLogger(__name__)
 
 app = Dash(
     name=__name__,
     external_stylesheets=[dbc.themes.DARKLY, dbc.icons.BOOTSTRAP],
+    # The observer of the lazy blocks only runs on pages that have some.
+    assets_ignore="" if config.LAZY_CHARTS else r"lazy_charts\.js",
 )
 
 # LOAD DATA-----------------------------------------------------------
 
-url_eez = "https://raw.githubusercontent.com/Ash12H/Data-viz-challenge-2024/main/data/shapes/2_clean/pacific_eez.geojson"
-url_education = "https://raw.githubusercontent.com/Ash12H/Data-viz-challenge-2024/main/data/3_product/education_attainment.parquet"
-url_unemployed = "https://raw.githubusercontent.com/Ash12H/Data-viz-challenge-2024/main/data/3_product/unemployed.parquet"
-url_alphabetisation = "https://raw.githubusercontent.com/Ash12H/Data-viz-challenge-2024/main/data/3_product/alphabetisation.parquet"
-
-pacific_eez = gpd.read_file(url_eez).drop(columns=["index"])
-education = pd.read_parquet(url_education)
-unemployed = pd.read_parquet(url_unemployed)
-alphabetisation = pd.read_parquet(url_alphabetisation)
 
-# CLIENT STORAGE -----------------------------------------------------------
-
-storage_data = {i: False for i in pacific_eez["pacific_island"]}
-storage = dcc.Store(id=id.STORE, data=storage_data)
+def prepare_version(app_data: AppData) -> DataVersion:
+    version = DataVersion.of(app_data)
+    if config.PRERENDER and not config.LAZY_CHARTS:
+        # Territory blocks rendered ahead of time, rebuilt for a new version or code
+        # (lazy blocks only render their charts on request).
+        try:
+            blocks = prerendered_blocks(version.query, version.key)
+        except OSError:
+            # Only a cache: the blocks are rendered on request instead.
+            logger.warning(
+                "Could not prerender the territory blocks in %s",
+                config.PRERENDER_DIR,
+                exc_info=True,
+            )
+            return version
+        version = replace(version, prerendered=blocks.get)
+    return version
+
+
+# Current data version (indexes and caches included), replaced in the background
+# when the data files change. Callbacks read it through the registry.
+registry = DataRegistry(prepare_version)
 
 # SETUP LAYOUT -----------------------------------------------------------
 title_div = html.H1(
@@ -59,86 +81,112 @@ sub_title_div = html.H2(
 )
 
 
-map_div = pacific_map(pacific_eez)
+pacific_map_callbacks(registry)
 
 charts_div = country_charts(
-    unemployed=unemployed,
-    education=education,
-    alphabetisation=alphabetisation,
+    registry=registry,
     id_out=id.CHART,
     storage=id.STORE,
+    manager=background_manager() if config.BACKGROUND_CHARTS else None,
 )
 
 offcanvas = menu()
 
-offcanvas_overall = overall_view(
-    alphabetisation=alphabetisation, education=education, unemployed=unemployed
-)
+offcanvas_overall = overall_view(registry=registry)
 
 # APP LAYOUT
 
-## PART 1
-
-first_screen = dbc.Row(
-    dbc.Col(
-        [
-            dbc.Row(
-                children=[dbc.Col(title_div, align="center", width=9, className="g-0")],
-                justify="center",
-                style={"height": "20vh"},
-            ),
-            dbc.Row(
-                children=[dbc.Col(map_div, align="center", className="g-0")],
-                justify="center",
-                style={"height": "80vh"},
-            ),
-        ],
-        className="g-0",
-        align="center",
-    ),
-    style={"height": "100vh"},
-    justify="center",
-)
 
-## PART 2
-
-second_screen = dbc.Row(
-    dbc.Col(
-        [
-            dbc.Row(
-                children=[dbc.Col(sub_title_div, align="center", className="g-0")],
-                justify="center",
-                style={"minHeight": "20vh"},
-            ),
-            dbc.Row(
-                id=id.CONTENT_ROW,
-                children=[charts_div],
-                justify="center",
-            ),
-            animated_arrow(True),
-            animated_arrow(False),
+@lru_cache(maxsize=1)
+def version_layout(version: DataVersion) -> dbc.Container:
+    """Layout of the pages loaded while `version` is the current one."""
+    map_div = pacific_map(version.app_data.territories, version.app_data.geojson)
+    year_div = year_selector(version.query.years)
+
+    # CLIENT STORAGE
+
+    # Positions of the selected territories in the map order of this version
+    # (see selection.py).
+    storage = dcc.Store(id=id.STORE, data=selection.empty(version.order))
+
+    ## PART 1
+
+    first_screen = dbc.Row(
+        dbc.Col(
+            [
+                dbc.Row(
+                    children=[
+                        dbc.Col(title_div, align="center", width=9, className="g-0")
+                    ],
+                    justify="center",
+                    style={"height": "20vh"},
+                ),
+                dbc.Row(
+                    children=[dbc.Col(map_div, align="center", className="g-0")],
+                    justify="center",
+                    style={"height": "80vh"},
+                ),
+            ],
+            className="g-0",
+            align="center",
+        ),
+        style={"height": "100vh"},
+        justify="center",
+    )
+
+    ## PART 2
+
+    second_screen = dbc.Row(
+        dbc.Col(
+            [
+                dbc.Row(
+                    children=[dbc.Col(sub_title_div, align="center", className="g-0")],
+                    justify="center",
+                    style={"minHeight": "20vh"},
+                ),
+                dbc.Row(
+                    children=[dbc.Col(year_div, className="g-0")], justify="center"
+                ),
+                dbc.Row(
+                    id=id.CONTENT_ROW,
+                    children=[charts_div],
+                    justify="center",
+                ),
+                animated_arrow(True),
+                animated_arrow(False),
+            ],
+            className="g-0",
+            align="center",
+        ),
+        justify="center",
+    )
+
+    main_layout = dbc.Container(
+        children=[
+            offcanvas,
+            offcanvas_overall,
+            storage,
+            first_screen,
+            second_screen,
         ],
-        className="g-0",
-        align="center",
-    ),
-    justify="center",
-)
+        id=id.MAIN_LAYOUT,
+        fluid=True,
+        style={"backgroundColor": "#FAFAFA"},
+    )
+    return main_layout
 
-main_layout = dbc.Container(
-    children=[
-        offcanvas,
-        offcanvas_overall,
-        storage,
-        first_screen,
-        second_screen,
-    ],
-    id=id.MAIN_LAYOUT,
-    fluid=True,
-    style={"backgroundColor": "#FAFAFA"},
-)
 
-app.layout = main_layout
+def serve_layout() -> dbc.Container:
+    return version_layout(registry.current)
+
+
+app.layout = serve_layout
 server = app.server
+# Started in each process serving requests (never in a preloading master).
+server.before_request(registry.watch)
+
+if config.METRICS:
+    instrument(app)
 
 if __name__ == "__main__":
     app.run_server(debug=False)
@@ -0,0 +1,48 @@
+// Lazy territory blocks (DATAVIZ_LAZY_CHARTS=1, see country_charts.py). Only
+// served in this mode (assets_ignore in app.py).
+//
+// A lazy block holds a placeholder (.lazy_charts) and a store of the same
+// pattern-matching id. When the placeholder gets within its data-margin pixels
+// of the viewport, the store is set to true, which triggers the callback
+// rendering the charts of this block only.
+(function () {
+    const STORE_TYPE = "territory_visible";
+    // One observer per prefetch margin.
+    const observers = {};
+    const observed = new WeakSet();
+
+    function show(entries, observer) {
+        entries.forEach((entry) => {
+            if (!entry.isIntersecting) {
+                return;
+            }
+            observer.unobserve(entry.target);
+            const id = JSON.parse(entry.target.id);
+            window.dash_clientside.set_props(
+                { ...id, type: STORE_TYPE },
+                { data: true },
+            );
+        });
+    }
+
+    function observe(placeholder) {
+        const margin = placeholder.dataset.margin || "0";
+        if (!(margin in observers)) {
+            observers[margin] = new IntersectionObserver(show, {
+                rootMargin: `${margin}px 0px`,
+            });
+        }
+        observed.add(placeholder);
+        observers[margin].observe(placeholder);
+    }
+
+    // Blocks are added by the chart callback: look for new placeholders after
+    // every change of the page.
+    new MutationObserver(() => {
+        document.querySelectorAll(".lazy_charts").forEach((placeholder) => {
+            if (!observed.has(placeholder)) {
+                observe(placeholder);
+            }
+        });
+    }).observe(document.body, { childList: true, subtree: true });
+})();
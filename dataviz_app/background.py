@@ -0,0 +1,31 @@
+"""
+Manager of the Dash background callbacks.
+
+With `DATAVIZ_BACKGROUND_CHARTS=1`, the chart callback starts a job in a process
+forked from the worker and returns right away: the browser then polls for its
+progress and result, so the worker keeps answering the other callbacks (the map
+selection) meanwhile. Jobs, progress and results go through a diskcache
+directory shared by the workers. When the callback is triggered again before
+its job ended (another selection or year), the browser asks for the superseded
+job to be terminated.
+"""
+
+from pathlib import Path
+
+from dash import DiskcacheManager
+
+from dataviz_app import config
+
+# Results never fetched (closed pages) are dropped after this many seconds.
+EXPIRE = 600
+
+
+def background_manager(directory: Path = config.BACKGROUND_DIR) -> DiskcacheManager:
+    try:
+        import diskcache
+    except ImportError as error:
+        raise ImportError(
+            "DATAVIZ_BACKGROUND_CHARTS=1 needs diskcache: "
+            "pip install 'dash[diskcache]'"
+        ) from error
+    return DiskcacheManager(diskcache.Cache(Path(directory)), expire=EXPIRE)
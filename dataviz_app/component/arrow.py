@@ -1,4 +1,4 @@
-from dash import html, callback, Input, Output
+from dash import html, clientside_callback, Input, Output
 from dataviz_app import id
 
 
@@ -19,13 +19,17 @@ def animated_arrow(right: bool) -> html.Div:
         style={position: "50px"},
     )
 
-    @callback(
+    clientside_callback(
+        """
+        function show_arrow(selected) {
+            if (!selected.positions.length) {
+                return {visibility: "hidden"};
+            }
+            return {};
+        }
+        """,
         Output(arrow_id, "style"),
         Input(id.STORE, "data"),
     )
-    def show_arrow(data: dict) -> bool:
-        if not any(data.values()):
-            return {"visibility": "hidden"}
-        return {}
 
     return arrow
@@ -1,40 +1,43 @@
+from functools import lru_cache
+
 from dash import dcc
 import plotly.express as px
 import pandas as pd
 
+from dataviz_app.templates import template
+
 BAR_WIDTH = 500
 SIZE_FONT = 20
 
+GENDERS = {"Femme": "Women", "Homme": "Men"}
+COLORS = {"Women": "#F6BA45", "Men": "#4878AD"}
+EDUCATION_LEVELS = {
+    "Petite enfance": "Kindergarten",
+    "Primaire": "Primary",
+    "Secondaire inf.": "Lower secondary",
+    "Secondaire sup.": "Upper secondary",
+    "Post-sec. non sup.": "Post-sec non-tertiary",
+    "Tertiaire": "Tertiary",
+    "Non indiqué": "Not specified",
+    "Total": "Total",
+}
 
-def education_bar(education: pd.DataFrame) -> dcc.Graph:
-    education_slice = education.rename(
-        columns={"Genre": "Gender", "Niveau d'éducation": "Education level"}
-    ).replace({"Femme": "Women", "Homme": "Men"})
 
-    education_slice["Education level"] = education_slice[
-        "Education level"
-    ].cat.rename_categories(
-        {
-            "Petite enfance": "Kindergarten",
-            "Primaire": "Primary",
-            "Secondaire inf.": "Lower secondary",
-            "Secondaire sup.": "Upper secondary",
-            "Post-sec. non sup.": "Post-sec non-tertiary",
-            "Tertiaire": "Tertiary",
-            "Non indiqué": "Not specified",
-            "Total": "Total",
-        }
+@lru_cache(maxsize=None)
+def _skeleton() -> tuple[dict, dict]:
+    """Layout and trace of each gender, built once: renders only set x and y."""
+    sample = pd.DataFrame(
+        {"Education level": "Total", "Ratio": 0.0, "Gender": list(COLORS)}
     )
-
     figure = px.bar(
-        education_slice,
+        sample,
         x="Education level",
         y="Ratio",
         color="Gender",
         barmode="stack",
         range_y=[0, 100],
-        template="plotly_dark",
-        color_discrete_map={"Women": "#F6BA45", "Men": "#4878AD"},
+        template=template("plotly_dark"),
+        color_discrete_map=COLORS,
         width=BAR_WIDTH,
     )
     figure.for_each_annotation(
@@ -71,4 +74,22 @@ def education_bar(education: pd.DataFrame) -> dcc.Graph:
         font=dict(size=SIZE_FONT, family="Times New Roman"),
     )
     figure.update_xaxes(title=None)
-    return dcc.Graph(figure=figure)
+    figure = figure.to_plotly_json()
+    return figure["layout"], {trace["name"]: trace for trace in figure["data"]}
+
+
+def education_bar(education: pd.DataFrame) -> dcc.Graph:
+    layout, traces = _skeleton()
+    levels = education["Niveau d'éducation"].cat.rename_categories(EDUCATION_LEVELS)
+
+    # One stacked trace per gender, in order of appearance (as plotly express).
+    data = [
+        {
+            **traces[GENDERS.get(gender, gender)],
+            "x": levels.loc[rows.index].to_numpy(),
+            "y": rows["Ratio"].to_numpy(),
+        }
+        for gender, rows in education.groupby("Genre", sort=False)
+    ]
+    # The layout is shared by every figure and never modified.
+    return dcc.Graph(figure={"data": data, "layout": layout})
@@ -1,34 +1,39 @@
+from functools import lru_cache
+
 from dash import dcc
 from plotly.subplots import make_subplots
 from plotly import graph_objects as go
 
+from dataviz_app.templates import template
 
-def alphabetisation_indicators(men, women) -> dcc.Graph:
-    def _indicator_generator(value, reference, title) -> go.Indicator:
-        return go.Indicator(
-            mode="number+delta",
-            value=value,
-            delta={
-                "reference": reference,
-                "relative": True,
-                "valueformat": ".1%",
-                "increasing": {"color": "#F6BA45"},
-                "decreasing": {"color": "#4878AD"},
-                "font": {"size": 30, "family": "Times New Roman"},
-            },
-            title={
-                "text": title,
-                "font": {"size": 40, "family": "Times New Roman"},
-            },
-            number={
-                "suffix": "%",
-                "valueformat": ".1f",
-                "font": {"size": 60, "family": "Times New Roman"},
-            },
-        )
-
-    femme = _indicator_generator(women, men, "Women")
-    homme = _indicator_generator(men, women, "Men")
+
+def _indicator_generator(value, reference, title) -> go.Indicator:
+    return go.Indicator(
+        mode="number+delta",
+        value=value,
+        delta={
+            "reference": reference,
+            "relative": True,
+            "valueformat": ".1%",
+            "increasing": {"color": "#F6BA45"},
+            "decreasing": {"color": "#4878AD"},
+            "font": {"size": 30, "family": "Times New Roman"},
+        },
+        title={
+            "text": title,
+            "font": {"size": 40, "family": "Times New Roman"},
+        },
+        number={
+            "suffix": "%",
+            "valueformat": ".1f",
+            "font": {"size": 60, "family": "Times New Roman"},
+        },
+    )
+
+
+@lru_cache(maxsize=None)
+def _skeleton() -> dict:
+    """Figure built once: renders only set the values and references."""
     figure = make_subplots(
         rows=2,
         cols=1,
@@ -39,7 +44,17 @@ def alphabetisation_indicators(men, women) -> dcc.Graph:
         plot_bgcolor="rgba(0,0,0,0)",
         paper_bgcolor="rgba(0,0,0,0)",
     )
-    figure.layout.template = "plotly_dark"
-    figure.add_trace(femme, row=1, col=1)
-    figure.add_trace(homme, row=2, col=1)
-    return dcc.Graph(figure=figure)
+    figure.layout.template = template("plotly_dark")
+    figure.add_trace(_indicator_generator(0, 0, "Women"), row=1, col=1)
+    figure.add_trace(_indicator_generator(0, 0, "Men"), row=2, col=1)
+    return figure.to_plotly_json()
+
+
+def alphabetisation_indicators(men, women) -> dcc.Graph:
+    skeleton = _skeleton()
+    femme, homme = skeleton["data"]
+    data = [
+        {**femme, "value": women, "delta": {**femme["delta"], "reference": men}},
+        {**homme, "value": men, "delta": {**homme["delta"], "reference": women}},
+    ]
+    return dcc.Graph(figure={"data": data, "layout": skeleton["layout"]})
@@ -1,23 +1,29 @@
+from functools import lru_cache
+
 import plotly.express as px
 import pandas as pd
 from dash import dcc
 
+from dataviz_app.templates import template
+
 SIZE_FONT = 20
 PIE_WIDTH = 300
 PIE_HEIGHT = 300
 
+GENDERS = {"Femme": "Women", "Homme": "Men"}
+COLORS = {"Women": "#F6BA45", "Men": "#4878AD"}
 
-def unemployed_pie(unemployed: pd.DataFrame) -> dcc.Graph:
-    unemp_sel = unemployed.rename(columns={"Sexe": "Gender"}).replace(
-        {"Femme": "Women", "Homme": "Men"}
-    )
 
+@lru_cache(maxsize=None)
+def _skeleton() -> dict:
+    """Figure built once: renders only set the slices of its trace."""
+    sample = pd.DataFrame({"Gender": list(COLORS), "Pourcentage": 1.0})
     unemployed_pie = px.pie(
-        unemp_sel,
+        sample,
         names="Gender",
         values="Pourcentage",
-        template="plotly_dark",
-        color_discrete_map={"Women": "#F6BA45", "Men": "#4878AD"},
+        template=template("plotly_dark"),
+        color_discrete_map=COLORS,
         color="Gender",
         width=PIE_WIDTH,
         height=PIE_HEIGHT,
@@ -34,8 +40,22 @@ def unemployed_pie(unemployed: pd.DataFrame) -> dcc.Graph:
         margin={"t": 20, "r": 0, "b": 0, "l": 0, "pad": 0},
         paper_bgcolor="rgba(0,0,0,0)",
     )
+    return unemployed_pie.to_plotly_json()
+
+
+def unemployed_pie(unemployed: pd.DataFrame) -> dcc.Graph:
+    skeleton = _skeleton()
+    trace = skeleton["data"][0]
+    labels = unemployed["Sexe"].replace(GENDERS).to_numpy()
+    slices = {
+        **trace,
+        "customdata": labels[:, None],
+        "labels": labels,
+        "marker": {**trace["marker"], "colors": [COLORS[g] for g in labels]},
+        "values": unemployed["Pourcentage"].to_numpy(),
+    }
     return dcc.Graph(
-        figure=unemployed_pie,
+        figure={"data": [slices], "layout": skeleton["layout"]},
         style={
             "padding": "0px",
             "margin": "0px",
@@ -1,13 +1,26 @@
-from dash import html, dcc, callback, Output, Input
-import pandas as pd
+import json
+import logging
+from functools import lru_cache
+
+from dash import html, dcc, callback, ctx, Output, Input, State, ALL, MATCH
+from dash import DiskcacheManager, Patch, no_update
 import dash_bootstrap_components as dbc
+from plotly.io.json import to_json_plotly
+from dataviz_app import config, id, selection
+from dataviz_app.cube import ALL_YEARS
+from dataviz_app.query import Indicators
+from dataviz_app.registry import DataRegistry, DataVersion
+from dataviz_app.component.indicator_columns import indicator_columns
 from dataviz_app.component.separator_wave import separator_wave
-from dataviz_app.component import charts
+
+logger = logging.getLogger(__name__)
 
 SIZE_FONT = 20
 BAR_WIDTH = 500
 PIE_WIDTH = 300
 PIE_HEIGHT = 300
+# Height of the charts of a lazy block before they are rendered.
+PLACEHOLDER_HEIGHT = 450
 
 
 def _main_title(title) -> html.Div:
@@ -18,146 +31,246 @@ def _main_title(title) -> html.Div:
     )
 
 
-def _helper_chart_title(title: str, style: dict = None) -> html.H4:
-    return html.H4(title, className="header_graph", style=style)
-
-
-def __helper_chart_by_country_alphabetisation(
-    country: str, alphabetisation: pd.DataFrame
-) -> dcc.Graph:
-    alph_sel = alphabetisation[
-        alphabetisation["Pays et territoires insulaires du Pacifique"] == country
-    ]
-
-    if alph_sel.empty:
-        return charts.no_data()
-
-    return charts.alphabetisation_indicators(
-        men=alph_sel["Homme"].values[0], women=alph_sel["Femme"].values[0]
+def _helper_block(
+    country: str, charts, year: int | str = ALL_YEARS, version: str = ""
+) -> html.Div:
+    # MAIN DIV
+    content = html.Div(
+        [
+            dbc.Row(_main_title(country.capitalize())),
+            dbc.Row(style={"height": "25px"}),
+            charts,
+            dbc.Row(style={"height": "100px"}),
+        ],
+        className="container_chart",
+    )
+    return dbc.Container(
+        children=[html.Div(separator_wave()), content],
+        id={
+            "type": id.TERRITORY_BLOCK,
+            "index": country,
+            "year": year,
+            "version": version,
+        },
+        fluid=True,
+        className="g-0",
     )
 
 
-def __helper_chart_by_country_education(
-    country: str, education: pd.DataFrame
-) -> dcc.Graph:
-    education_slice = education[
-        education["Pays et territoires insulaires du Pacifique"] == country
-    ]
-    if education_slice.empty:
-        return charts.no_data()
+def _helper_charts_row(indicators: Indicators) -> dbc.Row:
+    return dbc.Row(indicator_columns(indicators), justify="evenly")
 
-    return charts.education_bar(education_slice)
 
+def _helper_chart_by_country(
+    country: str, indicators: Indicators, year: int | str = ALL_YEARS, version: str = ""
+) -> html.Div:
+    return _helper_block(country, _helper_charts_row(indicators), year, version)
 
-def __helper_chart_by_country_unemployed(
-    country: str, unemployed: pd.DataFrame
-) -> dcc.Graph:
-    unemp_sel = unemployed[
-        unemployed["Pays et territoires insulaires du Pacifique"] == country
-    ]
 
-    if unemp_sel.empty:
-        return charts.no_data()
+def _helper_lazy_chart_by_country(
+    country: str,
+    year: int | str = ALL_YEARS,
+    version: str = "",
+    margin: int = config.LAZY_MARGIN,
+) -> html.Div:
+    # The charts are requested by setting the store, when the placeholder gets
+    # within `margin` pixels of the viewport (see assets/lazy_charts.js).
+    keys = {"index": country, "year": year, "version": version}
+    charts = html.Div(
+        [
+            dcc.Store(id={"type": id.TERRITORY_VISIBLE, **keys}, data=False),
+            html.Div(
+                id={"type": id.TERRITORY_CHARTS, **keys},
+                className="lazy_charts",
+                style={"minHeight": f"{PLACEHOLDER_HEIGHT}px"},
+                **{"data-margin": margin},
+            ),
+        ]
+    )
+    return _helper_block(country, charts, year, version)
 
-    return charts.unemployed_pie(unemp_sel)
 
+def _helper_spacer() -> html.Div:
+    return html.Div(style={"height": "100px"})
 
-def _helper_chart_by_country(
-    country: str,
-    unemployed: pd.DataFrame,
-    education: pd.DataFrame,
-    alphabetisation: pd.DataFrame,
-) -> html.Div:
-    def centered_row(children, **kwargs) -> dbc.Row:
-        return dbc.Row(
-            children,
-            justify="center",
-            align="center",
-            style={**kwargs},
-        )
 
-    # INDICATOR
-    title_alph = _helper_chart_title("Youth literacy rate")
-    alph_indicators = __helper_chart_by_country_alphabetisation(
-        country, alphabetisation
-    )
-    alph_div = dbc.Col(
-        [dbc.Row(title_alph, justify="start"), centered_row(alph_indicators)],
-        width="auto",
-    )
+def _helper_patch_blocks(
+    order: list[str], rendered: list[str], countries: list[str], chart_by_country
+) -> Patch:
+    # Blocks are always displayed in `order`, after the spacer.
+    patched = Patch()
+    current = [territory for territory in order if territory in rendered]
+    for position in reversed(range(len(current))):
+        if current[position] not in countries:
+            del patched[position + 1]
+    for position, country in enumerate(countries):
+        if country not in rendered:
+            patched.insert(position + 1, chart_by_country(country))
+    return patched
 
-    # PIE
-    title_unemployed = _helper_chart_title(
-        "Youth not in education employment or training",
-        style={"width": "400px"},
-    )
-    unemployed_pie = __helper_chart_by_country_unemployed(country, unemployed)
-    unemployed_div = dbc.Col(
-        [dbc.Row(title_unemployed), centered_row(unemployed_pie)],
-        width="auto",
-    )
 
-    # BAR
-    title_education = _helper_chart_title("Education attainment")
-    education = __helper_chart_by_country_education(country, education)
-    education_div = dbc.Col(
-        [dbc.Row(title_education), centered_row(education)],
-        width="auto",
-    )
+def _helper_counted(render, total: int, set_progress):
+    # Reports the number of blocks rendered so far, out of `total`.
+    done = {"blocks": 0}
+    set_progress((0, total))
 
-    # MAIN DIV
-    content = html.Div(
-        [
-            dbc.Row(_main_title(country.capitalize())),
-            dbc.Row(style={"height": "25px"}),
-            dbc.Row([alph_div, education_div, unemployed_div], justify="evenly"),
-            dbc.Row(style={"height": "100px"}),
-        ],
-        className="container_chart",
-    )
-    return dbc.Container(
-        children=[html.Div(separator_wave()), content], fluid=True, className="g-0"
-    )
+    def counted(country: str) -> html.Div | dict:
+        block = render(country)
+        done["blocks"] += 1
+        set_progress((done["blocks"], total))
+        return block
+
+    return counted
 
 
 def country_charts(
-    unemployed: pd.DataFrame,
-    education: pd.DataFrame,
-    alphabetisation: pd.DataFrame,
+    registry: DataRegistry,
     id_out: str,
     storage: str,
+    incremental: bool = config.INCREMENTAL_CHARTS,
+    manager: DiskcacheManager = None,
+    lazy: bool = config.LAZY_CHARTS,
 ) -> dbc.Col:
+    """
+    With a `manager`, the charts are rendered by background callbacks (see
+    background.py), with a progress bar. With `lazy`, the blocks are rendered
+    with placeholders and the charts of each block once it is near the
+    viewport.
+    """
     charts_div = dbc.Col(id=id_out, className="g-0")
 
-    @callback(
+    # A territory block only depends on the data version: build it once per
+    # process and version (or read it from the prerendered blocks).
+    @lru_cache(maxsize=config.CHART_CACHE_SIZE)
+    def chart_by_country(
+        version: DataVersion, country: str, year: int | str
+    ) -> html.Div | dict:
+        if lazy:
+            return _helper_lazy_chart_by_country(country, year, version.key)
+        block = version.prerendered(country, year) if version.prerendered else None
+        if block is None:
+            block = _helper_chart_by_country(
+                country, version.query.territory(country, year), year, version.key
+            )
+        return block
+
+    @lru_cache(maxsize=config.CHART_CACHE_SIZE)
+    def charts_by_country(
+        version: DataVersion, country: str, year: int | str
+    ) -> dbc.Row:
+        return _helper_charts_row(version.query.territory(country, year))
+
+    # Version whose blocks are cached: the blocks of the previous one are
+    # dropped with it.
+    cached = {"version": None}
+
+    def current_version() -> DataVersion:
+        version = registry.current
+        if cached["version"] is not version:
+            chart_by_country.cache_clear()
+            charts_by_country.cache_clear()
+            cached["version"] = version
+        return version
+
+    if lazy:
+        block = {"index": MATCH, "year": MATCH, "version": MATCH}
+
+        @callback(
+            Output({"type": id.TERRITORY_CHARTS, **block}, "children"),
+            Input({"type": id.TERRITORY_VISIBLE, **block}, "data"),
+            prevent_initial_call=True,
+        )
+        def show_charts(visible: bool) -> dbc.Row:
+            if not visible:
+                return no_update
+            # Blocks of a replaced data version show the current one until the
+            # column is rendered again.
+            country, year = ctx.triggered_id["index"], ctx.triggered_id["year"]
+            return charts_by_country(current_version(), country, year)
+
+    dependencies = [
         Output(id_out, "children"),
         Input(storage, "data"),
-    )
-    def update_charts_by_country(data: list) -> None | html.Div:
-        if not any(data.values()):
+        Input(id.YEAR, "value"),
+        State(
+            {"type": id.TERRITORY_BLOCK, "index": ALL, "year": ALL, "version": ALL},
+            "id",
+        ),
+    ]
+
+    def update_charts_by_country(
+        selected: dict, year: int | str, blocks: list, set_progress=None
+    ) -> None | list | Patch:
+        version = current_version()
+        territories = version.query.territories
+        countries = selection.decode(selected, territories, version.order)
+        if not countries:
             return None
 
-        countries = [territory for territory, selected in data.items() if selected]
+        rendered = [block["index"] for block in blocks]
+        # Blocks of another year or data version are all replaced.
+        current = all(
+            block["year"] == year and block["version"] == version.key
+            for block in blocks
+        )
 
-        unemployed_slice = unemployed[
-            unemployed["Pays et territoires insulaires du Pacifique"].isin(countries)
-        ]
-        education_slice = education[
-            education["Pays et territoires insulaires du Pacifique"].isin(countries)
-        ]
-        alphabetisation_slice = alphabetisation[
-            alphabetisation["Pays et territoires insulaires du Pacifique"].isin(
-                countries
-            )
-        ]
+        patch = incremental and rendered and current
+        if patch and set(rendered) == set(countries):
+            return no_update
+
+        def render(country: str) -> html.Div | dict:
+            return chart_by_country(version, country, year)
 
-        charts_children = [
-            _helper_chart_by_country(
-                country, unemployed_slice, education_slice, alphabetisation_slice
+        if set_progress is not None:
+            total = len(set(countries) - set(rendered)) if patch else len(countries)
+            render = _helper_counted(render, total, set_progress)
+
+        if patch:
+            children = _helper_patch_blocks(
+                list(territories), rendered, countries, render
             )
-            for country in countries
-        ]
+        else:
+            children = [_helper_spacer(), *[render(country) for country in countries]]
+        logger.debug("Territory charts cache: %s", chart_by_country.cache_info())
 
-        return dbc.Col([html.Div(style={"height": "100px"}), *charts_children])
+        return children
+
+    if manager is None:
+        callback(*dependencies)(update_charts_by_country)
+        return charts_div
+
+    progress_bar = dbc.Progress(
+        id=id.CHART_PROGRESS, striped=True, animated=True, style={"display": "none"}
+    )
+
+    # Runs in a process forked for each job: the blocks it renders are not kept
+    # in the cache of the worker (the prerendered ones are read from files).
+    @callback(
+        *dependencies,
+        background=True,
+        manager=manager,
+        interval=config.BACKGROUND_INTERVAL,
+        progress=[
+            Output(id.CHART_PROGRESS, "value"),
+            Output(id.CHART_PROGRESS, "max"),
+        ],
+        progress_default=[0, 1],
+        # A new page has no selection: no job for an empty column.
+        prevent_initial_call=True,
+        running=[
+            (
+                Output(id.CHART_PROGRESS, "style"),
+                {"display": "flex"},
+                {"display": "none"},
+            )
+        ],
+    )
+    def render_in_background(
+        set_progress, selected: dict, year: int | str, blocks: list
+    ) -> None | list | Patch:
+        children = update_charts_by_country(selected, year, blocks, set_progress)
+        # Pickled into the cache: as the JSON sent to the browser, since some
+        # components cannot be pickled.
+        return json.loads(to_json_plotly(children))
 
-    return charts_div
+    return dbc.Col([progress_bar, charts_div], className="g-0")
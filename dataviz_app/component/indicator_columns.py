@@ -0,0 +1,74 @@
+from dash import dcc, html
+import dash_bootstrap_components as dbc
+
+from dataviz_app.component import charts
+from dataviz_app.query import Indicators
+
+
+def _chart_title(title: str, style: dict = None) -> html.H4:
+    return html.H4(title, className="header_graph", style=style)
+
+
+def _centered_row(children, **kwargs) -> dbc.Row:
+    return dbc.Row(children, justify="center", align="center", style={**kwargs})
+
+
+def _alphabetisation_chart(indicators: Indicators) -> dcc.Graph:
+    alphabetisation = indicators.alphabetisation
+    if alphabetisation.empty:
+        return charts.no_data()
+
+    return charts.alphabetisation_indicators(
+        men=alphabetisation["Homme"].iloc[0], women=alphabetisation["Femme"].iloc[0]
+    )
+
+
+def _education_chart(indicators: Indicators) -> dcc.Graph:
+    if indicators.education.empty:
+        return charts.no_data()
+
+    return charts.education_bar(indicators.education)
+
+
+def _unemployed_chart(indicators: Indicators) -> dcc.Graph:
+    if indicators.unemployed.empty:
+        return charts.no_data()
+
+    return charts.unemployed_pie(indicators.unemployed)
+
+
+def indicator_columns(
+    indicators: Indicators, widths: tuple[str, str, str] = ("auto", "auto", "auto")
+) -> list[dbc.Col]:
+    """Literacy, education and NEET charts, with their titles, as columns."""
+    alphabetisation_width, education_width, unemployed_width = widths
+
+    # INDICATOR
+    alph_div = dbc.Col(
+        [
+            dbc.Row(_chart_title("Youth literacy rate"), justify="start"),
+            _centered_row(_alphabetisation_chart(indicators)),
+        ],
+        width=alphabetisation_width,
+    )
+
+    # BAR
+    education_div = dbc.Col(
+        [
+            dbc.Row(_chart_title("Education attainment")),
+            _centered_row(_education_chart(indicators)),
+        ],
+        width=education_width,
+    )
+
+    # PIE
+    title_unemployed = _chart_title(
+        "Youth not in education employment or training",
+        style={"width": "400px"},
+    )
+    unemployed_div = dbc.Col(
+        [dbc.Row(title_unemployed), _centered_row(_unemployed_chart(indicators))],
+        width=unemployed_width,
+    )
+
+    return [alph_div, education_div, unemployed_div]
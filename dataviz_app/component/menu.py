@@ -1,4 +1,6 @@
-from dash import html, callback, dcc
+import json
+
+from dash import html, clientside_callback, dcc
 from dash.dependencies import Input, Output, State
 import dash_bootstrap_components as dbc
 
@@ -101,25 +103,31 @@ def menu() -> html.Div:
         ]
     )
 
-    @callback(
+    clientside_callback(
+        """
+        function toggle_offcanvas(n1, is_open) {
+            return n1 ? !is_open : is_open;
+        }
+        """,
         Output(id.MENU, "is_open"),
         Input("button_menu", "n_clicks"),
         [State(id.MENU, "is_open")],
     )
-    def toggle_offcanvas(n1, is_open):
-        if n1:
-            return not is_open
-        return is_open
 
-    @callback(
+    # Both texts are embedded in the page, the switch runs in the browser.
+    clientside_callback(
+        f"""
+        function toggle_language(n_click, button_text) {{
+            if (n_click && button_text === "Français") {{
+                return [{json.dumps(FRENCH_CONTENT)}, "English"];
+            }}
+            return [{json.dumps(ENGLISH_CONTENT)}, "Français"];
+        }}
+        """,
         Output("info_content", "children"),
         Output("language", "children"),
         Input("language", "n_clicks"),
         State("language", "children"),
     )
-    def toggle_language(n_click, button_text):
-        if n_click and button_text == "Français":
-            return FRENCH_CONTENT, "English"
-        return ENGLISH_CONTENT, "Français"
 
     return canvas_menu
@@ -1,27 +1,35 @@
-import plotly.express as px
-import geopandas as gpd
-from dash import callback, Output, Input, State
+import plotly.graph_objects as go
+from dash import callback, clientside_callback, set_props, Output, Input, State, Patch
 from dash import dcc
 import pandas as pd
-from dataviz_app import id
+from dataviz_app import id, selection
+from dataviz_app.registry import DataRegistry
+from dataviz_app.templates import template
 
+COLOR_SELECTED = "#433279"
+COLOR_UNSELECTED = "grey"
 
-def _helper_pacific_map(pacific_eez: gpd.GeoDataFrame, selected: pd.Series):
-    data = pacific_eez.set_index("pacific_island")
-    data["Selected"] = selected
-    data = data.rename(columns={"ile_du_pacifique": "Nom français"})
-    # rename index
-    data.index.name = "English name"
 
-    figure = px.choropleth(
-        data_frame=data,
-        geojson=data.geometry,
-        locations=data.index,
-        color="Selected",
-        color_discrete_map={False: "grey", True: "#433279"},
-        hover_data={"Nom français": True, "Selected": False},
+def _helper_pacific_map(
+    territories: pd.DataFrame, geojson: dict, selected: list[int]
+) -> go.Figure:
+    # A single trace holds every territory: the selection only changes `z`,
+    # which lets the callbacks patch it without resending the geometry.
+    figure = go.Figure(
+        go.Choropleth(
+            geojson=geojson,
+            locations=territories["pacific_island"],
+            z=selection.flags(selected, len(territories)),
+            zmin=0,
+            zmax=1,
+            colorscale=[[0.0, COLOR_UNSELECTED], [1.0, COLOR_SELECTED]],
+            showscale=False,
+            customdata=territories[["ile_du_pacifique"]],
+            hovertemplate="English name=%{location}<br>"
+            "Nom français=%{customdata[0]}<extra></extra>",
+            marker_opacity=0.5,
+        )
     )
-    figure.update_traces(marker_opacity=0.5)
     figure.update_geos(
         projection=dict(type="natural earth", scale=1, rotation=dict(lon=180)),
         bgcolor="rgba(0,0,0,0)",
@@ -34,6 +42,7 @@ def _helper_pacific_map(pacific_eez: gpd.GeoDataFrame, selected: pd.Series):
         showcoastlines=True,
     )
     figure.update_layout(
+        template=template("plotly"),
         showlegend=False,
         margin=dict(l=0, r=0, t=0, b=0, pad=0, autoexpand=False),
         paper_bgcolor="rgba(0,0,0,0)",
@@ -43,35 +52,56 @@ def _helper_pacific_map(pacific_eez: gpd.GeoDataFrame, selected: pd.Series):
     return figure
 
 
-def pacific_map(pacific_eez: gpd.GeoDataFrame) -> dcc.Graph:
-    selected = pd.Series({i: False for i in pacific_eez["pacific_island"]})
-    map_div = dcc.Graph(
-        figure=_helper_pacific_map(pacific_eez, selected=selected),
+def _helper_pacific_map_patch(territories: pd.DataFrame, selected: list[int]) -> Patch:
+    patched = Patch()
+    patched["data"][0]["z"] = selection.flags(selected, len(territories))
+    return patched
+
+
+def pacific_map(territories: pd.DataFrame, geojson: dict) -> dcc.Graph:
+    return dcc.Graph(
+        figure=_helper_pacific_map(territories, geojson, selected=[]),
         id=id.PACIFIC_MAP,
         style={"height": "70vh", "margin": "0px", "padding": "0px"},
         config={"displayModeBar": False},
     )
 
-    @callback(
+
+def pacific_map_callbacks(registry: DataRegistry) -> None:
+    """Callbacks of the map, registered once for every data version."""
+    # Toggling the clicked territory runs in the browser. The store holds the
+    # sorted positions of the selected territories (see selection.py).
+    clientside_callback(
+        """
+        function update_storage(clickData, selected) {
+            if (!clickData) {
+                return selected;
+            }
+            const position = clickData.points[0].pointIndex;
+            const positions = selected.positions.includes(position)
+                ? selected.positions.filter((i) => i !== position)
+                : [...selected.positions, position].sort((a, b) => a - b);
+            return {...selected, positions: positions};
+        }
+        """,
         Output(id.STORE, "data"),
         Input(id.PACIFIC_MAP, "clickData"),
         State(id.STORE, "data"),
     )
-    def update_storage(clickData, rowData: dict):
-        if clickData is None:
-            return rowData
-        territory = clickData["points"][0]["location"]
-        if territory not in rowData:
-            return rowData
-        rowData[territory] = False if rowData[territory] else True
-        return rowData
 
     @callback(
         Output(id.PACIFIC_MAP, "figure"),
         Input(id.STORE, "data"),
+        prevent_initial_call=True,
     )
-    def update_content(data: dict):
-        selected = pd.Series(data)
-        return _helper_pacific_map(pacific_eez, selected=selected)
-
-    return map_div
+    def update_content(stored: dict):
+        version = registry.current
+        territories = version.app_data.territories
+        if not selection.same_order(stored, version.order):
+            # A page loaded before a reload changed the territories or their
+            # order: its positions mean nothing in the new one. It gets the map
+            # of the current version and an empty selection in its order.
+            set_props(id.STORE, {"data": selection.empty(version.order)})
+            return _helper_pacific_map(territories, version.app_data.geojson, [])
+        selected = selection.positions(stored, len(territories), version.order)
+        return _helper_pacific_map_patch(territories, selected=selected)
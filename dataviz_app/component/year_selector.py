@@ -0,0 +1,20 @@
+from dash import dcc, html
+
+from dataviz_app import id
+from dataviz_app.cube import ALL_YEARS
+
+
+def year_selector(years: list[int]) -> html.Div:
+    options = [{"label": "All years", "value": ALL_YEARS}]
+    options += [{"label": str(year), "value": year} for year in reversed(years)]
+    return html.Div(
+        dcc.Dropdown(
+            id=id.YEAR,
+            options=options,
+            value=ALL_YEARS,
+            clearable=False,
+            searchable=False,
+            style={"width": "200px", "color": "#0F0A31"},
+        ),
+        style={"display": "flex", "justifyContent": "center", "padding": "10px"},
+    )
@@ -0,0 +1,79 @@
+import os
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+LOG_LEVEL = os.environ.get("DATAVIZ_LOG_LEVEL", "INFO")
+
+# DATA ---------------------------------------------------------------------
+
+DATA_DIR = Path(os.environ.get("DATAVIZ_DATA_DIR", ROOT_DIR / "data"))
+REMOTE_DATA_URL = os.environ.get(
+    "DATAVIZ_REMOTE_DATA_URL",
+    "https://raw.githubusercontent.com/Ash12H/Data-viz-challenge-2024/main/data",
+)
+# The remote source is only used when explicitly allowed.
+ALLOW_REMOTE_DATA = os.environ.get("DATAVIZ_ALLOW_REMOTE_DATA", "0") == "1"
+
+# Format of the product tables read by the application: "parquet", or "arrow"
+# to memory-map the uncompressed Arrow IPC copies written by the pipeline.
+DATA_FORMAT = os.environ.get("DATAVIZ_DATA_FORMAT", "parquet")
+
+# Seconds between two checks of the data files by each worker, which loads the
+# new version in the background when they changed (0 disables the checks).
+RELOAD_INTERVAL = float(os.environ.get("DATAVIZ_RELOAD_INTERVAL", "5"))
+
+# Rows read at once from the raw csv exports by the data pipeline.
+INGEST_CHUNK_SIZE = int(os.environ.get("DATAVIZ_INGEST_CHUNK_SIZE", "100000"))
+
+# MAP ----------------------------------------------------------------------
+
+
+def _optional_int(name: str) -> int | None:
+    value = os.environ.get(name)
+    return int(value) if value else None
+
+
+# Budget used to pick the simplification level of the EEZ geometry.
+MAP_MAX_BYTES = _optional_int("DATAVIZ_MAP_MAX_BYTES")
+MAP_MAX_VERTICES = _optional_int("DATAVIZ_MAP_MAX_VERTICES")
+
+# CHARTS -------------------------------------------------------------------
+
+# Number of territory chart blocks kept in memory by each worker.
+CHART_CACHE_SIZE = int(os.environ.get("DATAVIZ_CHART_CACHE_SIZE", "64"))
+# Number of query results (indicators of a territory or of a selection) kept in
+# memory by each worker.
+QUERY_CACHE_SIZE = int(os.environ.get("DATAVIZ_QUERY_CACHE_SIZE", "256"))
+# Only insert/remove the blocks of toggled territories instead of re-rendering
+# the whole chart column.
+INCREMENTAL_CHARTS = os.environ.get("DATAVIZ_INCREMENTAL_CHARTS", "1") == "1"
+# Embed plotly templates reduced to what the figures use (see templates.py)
+# instead of the full built-in ones.
+PRUNED_TEMPLATES = os.environ.get("DATAVIZ_PRUNED_TEMPLATES", "1") == "1"
+
+# Serve the territory blocks prerendered in PRERENDER_DIR (see prerender.py),
+# built at startup when the data or the code changed.
+PRERENDER = os.environ.get("DATAVIZ_PRERENDER", "1") == "1"
+PRERENDER_DIR = Path(
+    os.environ.get("DATAVIZ_PRERENDER_DIR", ROOT_DIR / "build" / "prerender")
+)
+
+# Render the territory charts in background processes (see background.py, needs
+# `dash[diskcache]`) instead of inside the request, with their jobs and results
+# queued in BACKGROUND_DIR. The browser polls every BACKGROUND_INTERVAL ms.
+BACKGROUND_CHARTS = os.environ.get("DATAVIZ_BACKGROUND_CHARTS", "0") == "1"
+BACKGROUND_DIR = Path(
+    os.environ.get("DATAVIZ_BACKGROUND_DIR", ROOT_DIR / "build" / "background")
+)
+BACKGROUND_INTERVAL = int(os.environ.get("DATAVIZ_BACKGROUND_INTERVAL", "250"))
+
+# Render each territory block with a placeholder whose charts are only requested
+# when it gets within LAZY_MARGIN pixels of the viewport (see
+# assets/lazy_charts.js).
+LAZY_CHARTS = os.environ.get("DATAVIZ_LAZY_CHARTS", "0") == "1"
+LAZY_MARGIN = int(os.environ.get("DATAVIZ_LAZY_MARGIN", "600"))
+
+# METRICS ------------------------------------------------------------------
+
+# Serve the callback metrics on /metrics (Prometheus text format).
+METRICS = os.environ.get("DATAVIZ_METRICS", "1") == "1"
@@ -0,0 +1,128 @@
+"""
+Indicators by year, kept as a dense cube.
+
+The product tables average every year away. The pipeline (`product.year_cube`)
+also writes the sums and counts of the observations of each indicator as dense
+arrays of shape territory × sex × education level × year (a single level for the
+literacy rate and the NEET count), so the product values of every territory for
+one year are computed from a view of the last axis, without filtering or
+grouping the clean tables.
+"""
+
+import io
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Mapping
+
+import numpy as np
+import pandas as pd
+
+from dataviz_app.territory_index import TERRITORY, TerritoryIndex
+
+PATH = "3_product/cube.npz"
+INDICATORS = ["education", "alphabetisation", "unemployed"]
+SEXES = ["Homme", "Femme"]
+# Year selector value of the product tables (every year averaged).
+ALL_YEARS = "all"
+
+
+def _shares(men: np.ndarray, women: np.ndarray) -> np.ndarray:
+    with np.errstate(invalid="ignore", divide="ignore"):
+        total = men + women
+        return np.stack([men / total * 100, women / total * 100], axis=-1)
+
+
+class YearCube:
+    def __init__(self, arrays: Mapping[str, np.ndarray]):
+        self.territories = pd.Index(arrays["territories"].tolist(), name=TERRITORY)
+        self.years = arrays["years"].tolist()
+        self.levels = arrays["levels"].tolist()
+        self.sums = {name: arrays[f"{name}_sum"] for name in INDICATORS}
+        self.counts = {name: arrays[f"{name}_count"] for name in INDICATORS}
+        self._positions = {year: position for position, year in enumerate(self.years)}
+
+    def means(self, indicator: str, year: int) -> np.ndarray:
+        """Mean of the observations of `year`, NaN where there is none."""
+        position = self._positions[year]
+        sums = self.sums[indicator][..., position]
+        counts = self.counts[indicator][..., position]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(counts > 0, sums / counts, np.nan)
+
+    def values(self, indicator: str, year: int) -> np.ndarray:
+        """
+        Values of the product table of `indicator` for every territory, as in
+        `product.<table>` restricted to the observations of `year`: shares of
+        men and women by level (territory × level × sex) for the education,
+        shares of men and women (territory × sex) for the NEET and rates
+        (territory × sex) for the literacy.
+        """
+        means = self.means(indicator, year)
+        if indicator == "education":
+            # Levels without observations count as 0 in the sums by sex.
+            means = np.nan_to_num(np.where(means == 0, np.nan, means))
+            return _shares(means[:, 0], means[:, 1])
+        if indicator == "unemployed":
+            return _shares(means[:, 0, 0], means[:, 1, 0])
+        return means[:, :, 0]
+
+    def table(self, indicator: str, year: int) -> pd.DataFrame:
+        """Product table of `indicator` restricted to `year` (same columns)."""
+        values = self.values(indicator, year)
+        if indicator == "alphabetisation":
+            rows = np.flatnonzero(~np.isnan(values).all(axis=1))
+            table = pd.DataFrame(
+                {
+                    TERRITORY: self._territories(rows),
+                    "Femme": values[rows, 1],
+                    "Homme": values[rows, 0],
+                }
+            )
+            table.columns.name = "Sexe"
+            return table
+
+        positions = np.nonzero(~np.isnan(values))
+        columns = {TERRITORY: self._territories(positions[0])}
+        if indicator == "education":
+            columns["Niveau d'éducation"] = pd.Categorical.from_codes(
+                positions[1], categories=self.levels, ordered=True
+            )
+        sex = "Genre" if indicator == "education" else "Sexe"
+        columns[sex] = np.array(SEXES, dtype=object)[positions[-1]]
+        value = "Ratio" if indicator == "education" else "Pourcentage"
+        columns[value] = values[positions]
+        return pd.DataFrame(columns)
+
+    def tables(self, year: int) -> dict[str, pd.DataFrame]:
+        return {indicator: self.table(indicator, year) for indicator in INDICATORS}
+
+    def _territories(self, positions: np.ndarray) -> pd.Categorical:
+        return pd.Categorical.from_codes(positions, categories=self.territories)
+
+
+def read_cube(source: Path | io.BytesIO) -> YearCube:
+    with np.load(source, allow_pickle=False) as arrays:
+        return YearCube({name: arrays[name] for name in arrays.files})
+
+
+def indexes_by_year(
+    territory_index: TerritoryIndex, cube: YearCube = None
+) -> Callable[[int | str], TerritoryIndex]:
+    """
+    Index of the product tables for `ALL_YEARS`, or of the tables of one year
+    of the cube, built on first use. Territories keep the order (and the
+    positions) of `territory_index`. Unknown years get the product tables.
+    """
+
+    @lru_cache(maxsize=None)
+    def by_year(year: int) -> TerritoryIndex:
+        return TerritoryIndex(
+            cube.tables(year), territories=territory_index.territories
+        )
+
+    def index(year: int | str) -> TerritoryIndex:
+        if cube is None or not isinstance(year, int) or year not in cube.years:
+            return territory_index
+        return by_year(year)
+
+    return index
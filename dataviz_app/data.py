@@ -0,0 +1,242 @@
+import argparse
+import hashlib
+import io
+import json
+import logging
+import time
+import urllib.request
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+
+from dataviz_app import config, cube, geometry
+from dataviz_app.cube import YearCube
+
+logger = logging.getLogger(__name__)
+
+MANIFEST = "manifest.json"
+
+# Files needed by the application, relative to the data directory.
+TABLE_FILES = {
+    "education": "3_product/education_attainment.parquet",
+    "unemployed": "3_product/unemployed.parquet",
+    "alphabetisation": "3_product/alphabetisation.parquet",
+}
+# Uncompressed Arrow IPC copies, memory-mapped when DATA_FORMAT is "arrow".
+ARROW_FILES = {
+    "education": "3_product/education_attainment.arrow",
+    "unemployed": "3_product/unemployed.arrow",
+    "alphabetisation": "3_product/alphabetisation.arrow",
+}
+APP_FILES = [
+    *TABLE_FILES.values(),
+    *ARROW_FILES.values(),
+    cube.PATH,
+    geometry.INDEX,
+    *(geometry.level_path(level) for level in geometry.LEVELS),
+]
+
+
+class DataIntegrityError(Exception):
+    pass
+
+
+@dataclass
+class AppData:
+    territories: pd.DataFrame
+    geojson: dict
+    education: pd.DataFrame
+    unemployed: pd.DataFrame
+    alphabetisation: pd.DataFrame
+    timings: dict = field(default_factory=dict)
+    # Indicators by year; the application only offers "All years" without it.
+    cube: YearCube = None
+    # Identifies the content of the data files (see `data_version`).
+    version: str = ""
+
+
+def file_hash(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def data_version(manifest: dict, files: list = None) -> str:
+    """
+    Short hash of the manifest entries of `files` (default: every application
+    file): the same data has the same version in every process.
+    """
+    digest = hashlib.sha256()
+    for relative in files or APP_FILES:
+        digest.update(f"{relative} {manifest.get(relative)}\n".encode())
+    return digest.hexdigest()[:12]
+
+
+def read_manifest(data_dir: Path = config.DATA_DIR) -> dict:
+    path = Path(data_dir) / MANIFEST
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text())
+
+
+def write_manifest(data_dir: Path = config.DATA_DIR, files: list = None) -> dict:
+    """Record the sha256 of `files` (default: every application file)."""
+    data_dir = Path(data_dir)
+    manifest = read_manifest(data_dir)
+    for relative in files or APP_FILES:
+        manifest[relative] = file_hash(data_dir / relative)
+    manifest = dict(sorted(manifest.items()))
+    (data_dir / MANIFEST).write_text(json.dumps(manifest, indent=2) + "\n")
+    return manifest
+
+
+def fetch(
+    relative: str,
+    data_dir: Path = config.DATA_DIR,
+    manifest: dict = None,
+    allow_remote: bool = config.ALLOW_REMOTE_DATA,
+    remote_url: str = config.REMOTE_DATA_URL,
+) -> tuple[Path | io.BytesIO, str]:
+    """
+    Return a readable source for `relative` and where it comes from.
+
+    The bundled file is used when its hash matches the manifest. The remote
+    source is only tried when `allow_remote` is set, and its content must
+    match the manifest as well.
+    """
+    if manifest is None:
+        manifest = read_manifest(data_dir)
+    expected = manifest.get(relative)
+    if expected is None:
+        raise DataIntegrityError(f"{relative} is not listed in {MANIFEST}.")
+
+    local = Path(data_dir) / relative
+    if local.exists():
+        if file_hash(local) == expected:
+            return local, "local"
+        logger.warning("%s does not match its manifest hash.", local)
+    else:
+        logger.warning("%s is missing.", local)
+
+    if not allow_remote:
+        raise DataIntegrityError(
+            f"No valid local copy of {relative} and the remote source is disabled "
+            "(set DATAVIZ_ALLOW_REMOTE_DATA=1 to enable it)."
+        )
+
+    url = f"{remote_url.rstrip('/')}/{relative}"
+    try:
+        with urllib.request.urlopen(url, timeout=30) as response:
+            content = response.read()
+    except OSError as error:
+        raise DataIntegrityError(f"Could not download {url}.") from error
+    if hashlib.sha256(content).hexdigest() != expected:
+        raise DataIntegrityError(f"{url} does not match its manifest hash.")
+    return io.BytesIO(content), "remote"
+
+
+def _read_bytes(source: Path | io.BytesIO) -> bytes:
+    return source.read_bytes() if isinstance(source, Path) else source.getvalue()
+
+
+def read_arrow(source: Path | io.BytesIO) -> pd.DataFrame:
+    """
+    Read an Arrow IPC file, memory-mapped when local: no decoding, and the
+    columns converted without copy keep pointing to the page cache, shared by
+    every process reading the file.
+    """
+    if isinstance(source, Path):
+        buffer = pa.memory_map(str(source))
+    else:
+        buffer = pa.BufferReader(source.getvalue())
+    return pa.ipc.open_file(buffer).read_all().to_pandas(split_blocks=True)
+
+
+def load_app_data(
+    data_dir: Path = config.DATA_DIR,
+    allow_remote: bool = config.ALLOW_REMOTE_DATA,
+    remote_url: str = config.REMOTE_DATA_URL,
+    max_bytes: int = config.MAP_MAX_BYTES,
+    max_vertices: int = config.MAP_MAX_VERTICES,
+    data_format: str = config.DATA_FORMAT,
+) -> AppData:
+    manifest = read_manifest(data_dir)
+
+    def _fetch(relative):
+        return fetch(relative, data_dir, manifest, allow_remote, remote_url)
+
+    loaded = {}
+    timings = {}
+    start = time.perf_counter()
+
+    source, origin = _fetch(geometry.INDEX)
+    levels = json.loads(_read_bytes(source))
+    level = geometry.select_level(levels, max_bytes, max_vertices)
+    source, origin = _fetch(levels[level]["path"])
+    loaded["territories"], loaded["geojson"] = geometry.read_level(_read_bytes(source))
+    timings["geometry"] = {
+        "source": origin,
+        "seconds": time.perf_counter() - start,
+        "level": level,
+    }
+    logger.info(
+        "Loaded the map geometry (%s level, %d vertices) from %s in %.3fs",
+        level,
+        levels[level]["vertices"],
+        origin,
+        timings["geometry"]["seconds"],
+    )
+
+    if data_format not in ("parquet", "arrow"):
+        raise ValueError(f"Unknown data format {data_format!r}.")
+    files, read = (
+        (ARROW_FILES, read_arrow)
+        if data_format == "arrow"
+        else (TABLE_FILES, pd.read_parquet)
+    )
+    for name, relative in files.items():
+        tic = time.perf_counter()
+        source, origin = _fetch(relative)
+        loaded[name] = read(source)
+        timings[name] = {"source": origin, "seconds": time.perf_counter() - tic}
+        logger.info(
+            "Loaded %s from %s in %.3fs", name, origin, timings[name]["seconds"]
+        )
+
+    tic = time.perf_counter()
+    source, origin = _fetch(cube.PATH)
+    loaded["cube"] = cube.read_cube(source)
+    timings["cube"] = {"source": origin, "seconds": time.perf_counter() - tic}
+    logger.info(
+        "Loaded the year cube (%d years) from %s in %.3fs",
+        len(loaded["cube"].years),
+        origin,
+        timings["cube"]["seconds"],
+    )
+
+    timings["total"] = {"seconds": time.perf_counter() - start}
+    logger.info("Application data loaded in %.3fs", timings["total"]["seconds"])
+
+    return AppData(**loaded, timings=timings, version=data_version(manifest))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check or load the application data.")
+    parser.add_argument(
+        "--update-manifest",
+        action="store_true",
+        help=f"Rewrite {MANIFEST} from the current content of the data directory.",
+    )
+    args = parser.parse_args()
+
+    if args.update_manifest:
+        for relative, digest in write_manifest().items():
+            print(f"{digest}  {relative}")
+    else:
+        data = load_app_data()
+        for name, timing in data.timings.items():
+            print(f"{name:<16} {timing.get('source', ''):<7} {timing['seconds']:.3f}s")
@@ -0,0 +1,42 @@
+"""
+Map geometry served by the application.
+
+The pipeline (`dataviz_app.pipeline.shapes`) writes one JSON file per level of
+simplification, holding the territory names and the GeoJSON of the choropleth
+in the form the figure embeds, so the application reads it with `json` only.
+"""
+
+import json
+
+import pandas as pd
+
+SOURCE = "shapes/2_clean/pacific_eez.geojson"
+LEVELS_DIR = "shapes/3_product"
+INDEX = f"{LEVELS_DIR}/levels.json"
+
+# Simplification tolerance of each level, in degrees. From finest to coarsest.
+LEVELS = {"full": 0.0, "high": 0.02, "medium": 0.05, "low": 0.2}
+
+
+def level_path(level: str) -> str:
+    return f"{LEVELS_DIR}/pacific_eez_{level}.json"
+
+
+def select_level(
+    index: dict[str, dict], max_bytes: int = None, max_vertices: int = None
+) -> str:
+    """Finest level that fits the budget, or the coarsest one if none does."""
+    by_size = sorted(index, key=lambda level: index[level]["vertices"], reverse=True)
+    for level in by_size:
+        if max_bytes is not None and index[level]["bytes"] > max_bytes:
+            continue
+        if max_vertices is not None and index[level]["vertices"] > max_vertices:
+            continue
+        return level
+    return by_size[-1]
+
+
+def read_level(content: bytes) -> tuple[pd.DataFrame, dict]:
+    """Territories (one row per map feature) and GeoJSON of a level file."""
+    level = json.loads(content)
+    return pd.DataFrame(level["territories"]), level["geojson"]
@@ -4,13 +4,19 @@ STORE = "store"
 MAIN_LAYOUT = "main_layout"
 MENU = "menu"
 OVERALL_VIEW = "overall_view"
+YEAR = "year"
 # ROWS
 MAP_ROW = "map_row"
 CONTENT_ROW = "content_row"
 # FIGURES
 CHART = "chart"
+CHART_PROGRESS = "chart_progress"
 PACIFIC_MAP = "pacific_map"
 AGRID = "agrid_territory"
 OVERALL_CONTENT = "overall_content"
 # ARROW
 ARROW = "arrow"
+# PATTERN-MATCHING TYPES
+TERRITORY_BLOCK = "territory_block"
+TERRITORY_CHARTS = "territory_charts"
+TERRITORY_VISIBLE = "territory_visible"  # Also in assets/lazy_charts.js.
@@ -0,0 +1,135 @@
+"""
+Call counts, latency, response size and errors of the Dash callbacks.
+
+`instrument(app)` times every request to the callback route of the application,
+keyed by the `output` of its body, and serves the metrics in the Prometheus text
+format on `/metrics`. Metrics are kept in memory by each process: behind
+gunicorn, every scrape reads the worker that answered it.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+
+from dash import Dash
+from flask import Response, g, request
+
+PREFIX = "dataviz_callback"
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+# Label of the requests naming no callback of the application.
+UNKNOWN = "unknown"
+
+# Upper bounds of the histogram buckets.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = tuple(256 * 4**i for i in range(9))  # 256 B to 16 MiB
+
+
+class Histogram:
+    def __init__(self, buckets: tuple):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    def lines(self, name: str, labels: str) -> list[str]:
+        lines = []
+        total = 0
+        for bound, count in zip([*self.buckets, "+Inf"], self.counts):
+            total += count
+            lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {total}')
+        lines.append(f"{name}_sum{{{labels}}} {self.sum}")
+        lines.append(f"{name}_count{{{labels}}} {total}")
+        return lines
+
+
+class CallbackMetrics:
+    """Metrics of every callback, keyed by its output id."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = {}
+        self.latency = {}
+        self.size = {}
+
+    def record(self, output: str, outcome: str, duration: float, size: int = None):
+        with self.lock:
+            key = (output, outcome)
+            self.calls[key] = self.calls.get(key, 0) + 1
+            if output not in self.latency:
+                self.latency[output] = Histogram(LATENCY_BUCKETS)
+                self.size[output] = Histogram(SIZE_BUCKETS)
+            self.latency[output].observe(duration)
+            if size is not None:
+                self.size[output].observe(size)
+
+    def render(self) -> str:
+        with self.lock:
+            lines = [
+                f"# HELP {PREFIX}_calls_total Callback calls by outcome.",
+                f"# TYPE {PREFIX}_calls_total counter",
+            ]
+            for (output, outcome), count in sorted(self.calls.items()):
+                lines.append(
+                    f"{PREFIX}_calls_total{{{_label(output)},"
+                    f'outcome="{outcome}"}} {count}'
+                )
+            for name, histograms, description in [
+                ("duration_seconds", self.latency, "Callback latency."),
+                ("response_bytes", self.size, "Size of the JSON responses."),
+            ]:
+                lines.append(f"# HELP {PREFIX}_{name} {description}")
+                lines.append(f"# TYPE {PREFIX}_{name} histogram")
+                for output, histogram in sorted(histograms.items()):
+                    lines += histogram.lines(f"{PREFIX}_{name}", _label(output))
+        return "\n".join(lines) + "\n"
+
+
+def _label(output: str) -> str:
+    # Pattern-matching outputs are JSON ids: escape them as label values.
+    value = output.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return f'output="{value}"'
+
+
+def _outcome(status: int) -> str:
+    if status == 204:
+        # PreventUpdate or no_update.
+        return "prevented"
+    return "ok" if status < 400 else "error"
+
+
+def instrument(app: Dash, path: str = "/metrics") -> CallbackMetrics:
+    """Time the callback requests of `app` and serve their metrics."""
+    metrics = CallbackMetrics()
+    route = f"{app.config.routes_pathname_prefix}_dash-update-component"
+
+    @app.server.before_request
+    def start():
+        if request.path == route:
+            g.dataviz_metrics_start = time.perf_counter()
+
+    @app.server.after_request
+    def record(response: Response) -> Response:
+        start = g.pop("dataviz_metrics_start", None)
+        if start is not None:
+            body = request.get_json(silent=True) or {}
+            output = body.get("output") if isinstance(body, dict) else None
+            # One series per callback: other outputs are made up by a client.
+            if not isinstance(output, str) or output not in app.callback_map:
+                output = UNKNOWN
+            metrics.record(
+                output,
+                _outcome(response.status_code),
+                time.perf_counter() - start,
+                len(response.get_data()),
+            )
+        return response
+
+    app.server.add_url_rule(
+        path,
+        "dataviz_metrics",
+        lambda: Response(metrics.render(), content_type=CONTENT_TYPE),
+    )
+    return metrics
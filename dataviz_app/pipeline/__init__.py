@@ -0,0 +1 @@
+from dataviz_app.pipeline.runner import STAGES, Stage, StageReport, run_pipeline
@@ -0,0 +1,32 @@
+import argparse
+
+from dataviz_app.pipeline import STAGES, run_pipeline
+
+parser = argparse.ArgumentParser(
+    prog="python -m dataviz_app.pipeline",
+    description="Build data/2_clean, data/3_product and the map geometry from the "
+    "raw files. Only the stages whose inputs or outputs changed are run.",
+)
+names = [stage.name for stage in STAGES]
+parser.add_argument(
+    "stages",
+    nargs="*",
+    metavar="stage",
+    help=f"Only consider these stages: {', '.join(names)}.",
+)
+parser.add_argument(
+    "--force", action="store_true", help="Run stages even if up to date."
+)
+args = parser.parse_args()
+unknown = [name for name in args.stages if name not in names]
+if unknown:
+    parser.error(
+        f"unknown stages {', '.join(unknown)} (choose from {', '.join(names)})"
+    )
+
+reports = run_pipeline(only=args.stages, force=args.force)
+
+print(f"{'stage':<56} {'status':<11} {'seconds':>8}")
+for report in reports:
+    print(f"{report.name:<56} {report.status:<11} {report.seconds:>8.3f}")
+print(f"{'total':<56} {'':<11} {sum(r.seconds for r in reports):>8.3f}")
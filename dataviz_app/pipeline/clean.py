@@ -0,0 +1,71 @@
+from pathlib import Path
+
+import pandas as pd
+
+from dataviz_app.pipeline.ingest import read_sdmx
+from dataviz_app.territory_index import TERRITORY
+
+# Keep the pivoted indicators with enough observations.
+MIN_OBSERVATIONS = 10
+
+
+def _pivot(path: Path, index: list[str], columns: str, renames: dict) -> pd.DataFrame:
+    # One averaged row per combination: pivoting it gives the same table as
+    # pivoting the whole export.
+    data = read_sdmx(path, [*index, columns], renames)
+    for category in [*index[:-1], columns]:
+        data[category] = data[category].astype("category")
+    return data.pivot_table(
+        index=index, columns=columns, values="OBS_VALUE", observed=False
+    )
+
+
+def _keep_observed(data: pd.DataFrame) -> pd.DataFrame:
+    return data[data.columns[data.notna().sum() > MIN_OBSERVATIONS]]
+
+
+def education_attainment(path: Path) -> pd.DataFrame:
+    renames = {
+        "Îles Marshall (pays)": "Marshall Islands",
+        "Palaos": "Palau",
+    }
+    index = [TERRITORY, "Sexe", "Âge", "Urbanisation", "Invalidité", "TIME_PERIOD"]
+
+    data = _pivot(path, index, "Niveau d'éducation", renames)
+    return _keep_observed(data.sort_index().reset_index())
+
+
+def literacy_rates(path: Path) -> pd.DataFrame:
+    renames = {
+        "Îles Marshall (pays)": "Marshall Islands",
+        "Fidji": "Fiji",
+        "États fédérés de Micronésie (pays)": "Micronesia",
+        "Papouasie-Nouvelle-Guinée": "Papua New Guinea",
+        "Wallis-et-Futuna": "Wallis and Futuna",
+        "Îles Cook": "Cook Islands",
+        "Nouvelle-Calédonie": "New Caledonia",
+        "Polynésie française": "French Polynesia",
+        "Palaos": "Palau",
+        "Salomon": "Solomon Islands",
+        "Îles Mariannes du Nord": "Northern Mariana Islands",
+        "Samoa américaines": "Samoa",
+    }
+    index = [TERRITORY, "Sexe", "Âge", "Urbanisation", "Invalidité", "TIME_PERIOD"]
+
+    data = _pivot(path, index, "Indicateur", renames)
+    return _keep_observed(data.dropna(axis="rows", how="all").reset_index())
+
+
+def youth_not_in_education_employment_or_training(path: Path) -> pd.DataFrame:
+    renames = {
+        "Îles Marshall (pays)": "Marshall Islands",
+        "Salomon": "Solomon Islands",
+        "Palaos": "Palau",
+        "Samoa": "Papua New Guinea",
+        "Îles Cook": "Cook Islands",
+        "États fédérés de Micronésie (pays)": "Micronesia",
+    }
+    index = [TERRITORY, "Sexe", "Urbanisation", "Invalidité", "TIME_PERIOD"]
+
+    data = _pivot(path, index, "Indicateur", renames)
+    return _keep_observed(data.reset_index())
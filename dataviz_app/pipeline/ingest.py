@@ -0,0 +1,63 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from dataviz_app import config
+from dataviz_app.territory_index import TERRITORY
+
+VALUE = "OBS_VALUE"
+
+
+def read_sdmx(
+    path: Path,
+    keys: list[str],
+    renames: dict = None,
+    chunksize: int = config.INGEST_CHUNK_SIZE,
+) -> pd.DataFrame:
+    """
+    Mean of OBS_VALUE for each combination of `keys` in an SDMX csv export.
+
+    Only `keys` and OBS_VALUE are parsed, as categories (except TIME_PERIOD),
+    and the file is read `chunksize` rows at a time while sums and counts are
+    accumulated, so memory follows the number of combinations rather than the
+    size of the file. Combinations without any value are kept with a NaN mean.
+    `renames` is applied to the territory names before averaging.
+    """
+    dtypes = {key: "category" for key in keys if key != "TIME_PERIOD"}
+    chunks = pd.read_csv(
+        path,
+        sep=";",
+        usecols=[*keys, VALUE],
+        dtype=dtypes,
+        chunksize=chunksize,
+    )
+
+    totals = None
+    for chunk in chunks:
+        partial = _labels(
+            chunk.groupby(keys, observed=True)[VALUE].agg(["sum", "count"]), keys
+        )
+        if totals is not None:
+            partial = pd.concat([totals, partial]).groupby(level=keys).sum()
+        totals = partial
+
+    if totals is None:
+        return pd.DataFrame(columns=[*keys, VALUE])
+
+    if renames:
+        totals = totals.rename(index=renames, level=TERRITORY)
+        totals = totals.groupby(level=keys).sum()
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = (totals["sum"] / totals["count"]).where(totals["count"] > 0)
+    return mean.rename(VALUE).reset_index()
+
+
+def _labels(frame: pd.DataFrame, keys: list[str]) -> pd.DataFrame:
+    # Each chunk infers its own categories: merge chunks on labels, not codes.
+    frame.index = pd.MultiIndex.from_arrays(
+        [frame.index.get_level_values(key).astype(object) for key in keys],
+        names=keys,
+    )
+    return frame
@@ -0,0 +1,186 @@
+import numpy as np
+import pandas as pd
+
+from dataviz_app.cube import SEXES
+from dataviz_app.territory_index import TERRITORY
+
+EDUCATION_LEVELS = {
+    "L'éducation de la petite enfance": "Petite enfance",
+    "Enseignement primaire": "Primaire",
+    "Enseignement secondaire inférieur": "Secondaire inf.",
+    "L'enseignement secondaire supérieur": "Secondaire sup.",
+    "Enseignement post-secondaire non supérieur": "Post-sec. non sup.",
+    "Éducation tertiaire": "Tertiaire",
+    "Niveau non indiqué": "Non indiqué",
+    "Tous les niveaux d'enseignement": "Total",
+}
+LITERACY = "Taux d'alphabétisation des 15-24 ans (%)"
+NEET = "Nombre de jeunes personnes sans études, emploi ni formation"
+
+
+def _gender_shares(men: pd.Series, women: pd.Series) -> tuple[pd.Series, pd.Series]:
+    total = men + women
+    return (men / total) * 100, (women / total) * 100
+
+
+def education_attainment(
+    data: pd.DataFrame, levels: dict[str, str] = EDUCATION_LEVELS
+) -> pd.DataFrame:
+    """Share of women and men at each education level, by territory."""
+    data_stacked = (
+        data.set_index([TERRITORY, "TIME_PERIOD", "Sexe"])
+        .drop(columns=["Âge", "Urbanisation", "Invalidité"])
+        .stack()
+        .reset_index()
+        .rename(columns={0: "Value"})
+    )
+    data_stacked = data_stacked.query("Sexe != 'Total'").copy()
+    data_stacked["Niveau d'éducation"] = pd.Categorical(
+        data_stacked["Niveau d'éducation"].replace(levels),
+        ordered=True,
+        categories=levels.values(),
+    )
+
+    all_data = (
+        data_stacked.groupby([TERRITORY, "Sexe", "Niveau d'éducation"], observed=False)[
+            "Value"
+        ]
+        .mean()
+        .replace(0, np.nan)
+        .dropna()
+        .reset_index()
+    )
+
+    def by_sex(sex: str) -> pd.DataFrame:
+        return (
+            all_data.query(f"Sexe == '{sex}'")
+            .drop(columns="Sexe")
+            .groupby([TERRITORY, "Niveau d'éducation"], observed=False)
+            .sum()
+        )
+
+    men, women = _gender_shares(by_sex("Homme"), by_sex("Femme"))
+    ratio = men.rename(columns={"Value": "Homme"})
+    ratio["Femme"] = women["Value"]
+    return (
+        ratio.stack().rename("Ratio").reset_index().rename(columns={"level_2": "Genre"})
+    )
+
+
+def alphabetisation(data: pd.DataFrame) -> pd.DataFrame:
+    """Youth literacy rate of women and men, by territory."""
+    by_country = (
+        data.groupby([TERRITORY, "Sexe"], observed=False)[LITERACY]
+        .mean()
+        .dropna()
+        .reset_index()
+    )
+    by_country = by_country.query("Sexe != 'Total'")
+    by_country = by_country.pivot_table(
+        values=LITERACY, columns="Sexe", index=TERRITORY, observed=False
+    )
+    return by_country.reset_index()
+
+
+def unemployed(data: pd.DataFrame) -> pd.DataFrame:
+    """Share of women and men among the youth not in education, employment or
+    training, by territory."""
+    data = data.query("Sexe != 'Total'")
+    by_country = (
+        data.groupby([TERRITORY, "Sexe"], observed=False)[NEET]
+        .mean()
+        .dropna()
+        .reset_index()
+    )
+
+    def by_sex(sex: str) -> pd.DataFrame:
+        return (
+            by_country.query(f"Sexe == '{sex}'")
+            .drop(columns="Sexe")
+            .set_index(TERRITORY)
+            .dropna()
+        )
+
+    men, women = _gender_shares(by_sex("Homme"), by_sex("Femme"))
+    result = men.rename(columns={NEET: "Homme"}).sort_index()
+    result["Femme"] = women.rename(columns={NEET: "Femme"}).sort_index()
+    result = result.stack().reset_index()
+    return result.rename({"level_1": "Sexe", 0: "Pourcentage"}, axis=1)
+
+
+def _stack_levels(data: pd.DataFrame) -> pd.DataFrame:
+    # One row per observation of a level, as in `education_attainment`.
+    return (
+        data.set_index([TERRITORY, "TIME_PERIOD", "Sexe"])
+        .drop(columns=["Âge", "Urbanisation", "Invalidité"])
+        .stack()
+        .rename("Value")
+        .reset_index()
+    )
+
+
+def year_cube(
+    education: pd.DataFrame,
+    literacy: pd.DataFrame,
+    neet: pd.DataFrame,
+    levels: dict[str, str] = EDUCATION_LEVELS,
+) -> dict[str, np.ndarray]:
+    """
+    Sums and counts of the observations of each indicator by territory, sex,
+    education level and year (see `dataviz_app.cube`). Summed over the years,
+    they give the product tables.
+    """
+    observations = {
+        "education": _stack_levels(education),
+        "alphabetisation": literacy.rename(columns={LITERACY: "Value"}),
+        "unemployed": neet.rename(columns={NEET: "Value"}),
+    }
+    observations = {
+        name: data.query("Sexe != 'Total'").dropna(subset="Value")
+        for name, data in observations.items()
+    }
+
+    def union(column: str) -> pd.Index:
+        return pd.Index(
+            sorted(
+                set().union(*(data[column].unique() for data in observations.values()))
+            )
+        )
+
+    territories = union(TERRITORY)
+    years = union("TIME_PERIOD")
+    labels = pd.Index(list(levels.values()))
+    sexes = pd.Index(SEXES)
+
+    arrays = {
+        "territories": territories.to_numpy(dtype=str),
+        "years": years.to_numpy(dtype="int64"),
+        "levels": labels.to_numpy(dtype=str),
+    }
+    for name, data in observations.items():
+        if name == "education":
+            level = labels.get_indexer(data["Niveau d'éducation"].map(levels))
+        else:
+            level = np.zeros(len(data), dtype=int)
+        positions = (
+            territories.get_indexer(data[TERRITORY]),
+            sexes.get_indexer(data["Sexe"]),
+            level,
+            years.get_indexer(data["TIME_PERIOD"]),
+        )
+        values = data["Value"].to_numpy(dtype=float)
+        # Observations of the levels missing from `levels` are left out.
+        keep = np.all([p >= 0 for p in positions], axis=0)
+        positions = tuple(p[keep] for p in positions)
+
+        shape = (
+            len(territories),
+            len(sexes),
+            len(labels) if name == "education" else 1,
+            len(years),
+        )
+        arrays[f"{name}_sum"] = np.zeros(shape)
+        arrays[f"{name}_count"] = np.zeros(shape, dtype="int64")
+        np.add.at(arrays[f"{name}_sum"], positions, values[keep])
+        np.add.at(arrays[f"{name}_count"], positions, 1)
+    return arrays
@@ -0,0 +1,204 @@
+import json
+import logging
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from dataviz_app import config, cube, geometry
+from dataviz_app.data import file_hash, write_manifest
+from dataviz_app.pipeline import clean, product, shapes
+
+logger = logging.getLogger(__name__)
+
+STATE = "pipeline_state.json"
+
+
+@dataclass
+class Stage:
+    name: str
+    inputs: list[str]
+    outputs: list[str]
+    run: Callable[[Path], None]
+
+
+@dataclass
+class StageReport:
+    name: str
+    status: str
+    seconds: float = 0.0
+    changed: list[str] = field(default_factory=list)
+
+
+def _clean_stage(name: str, function, raw: str) -> Stage:
+    target = f"2_clean/{name}.parquet"
+
+    def run(data_dir: Path) -> None:
+        function(data_dir / raw).to_parquet(data_dir / target)
+
+    return Stage(f"clean/{name}", [raw], [target], run)
+
+
+def _product_stage(name: str, function, source: str, **to_parquet) -> Stage:
+    target = f"3_product/{name}.parquet"
+
+    def run(data_dir: Path) -> None:
+        data = function(pd.read_parquet(data_dir / source))
+        data.to_parquet(data_dir / target, **to_parquet)
+
+    return Stage(f"product/{name}", [source], [target], run)
+
+
+def _arrow_stage(name: str) -> Stage:
+    source = f"3_product/{name}.parquet"
+    target = f"3_product/{name}.arrow"
+
+    def run(data_dir: Path) -> None:
+        # Uncompressed, so that the application can memory-map the columns.
+        table = pq.read_table(data_dir / source)
+        with pa.OSFile(str(data_dir / target), "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+
+    return Stage(f"arrow/{name}", [source], [target], run)
+
+
+def _cube_stage(sources: list[str]) -> Stage:
+    def run(data_dir: Path) -> None:
+        arrays = product.year_cube(
+            *(pd.read_parquet(data_dir / source) for source in sources)
+        )
+        with open(data_dir / cube.PATH, "wb") as file:
+            np.savez(file, **arrays)
+
+    return Stage("product/cube", sources, [cube.PATH], run)
+
+
+STAGES = [
+    _clean_stage(
+        "education_attainment",
+        clean.education_attainment,
+        "1_raw/education_attainment.csv",
+    ),
+    _clean_stage(
+        "literacy_rates",
+        clean.literacy_rates,
+        "1_raw/literacy_rates.csv",
+    ),
+    _clean_stage(
+        "youth_not_in_education_employment_or_training",
+        clean.youth_not_in_education_employment_or_training,
+        "1_raw/youth_not_in_education_employment_or_training.csv",
+    ),
+    _product_stage(
+        "education_attainment",
+        product.education_attainment,
+        "2_clean/education_attainment.parquet",
+        index=False,
+    ),
+    _product_stage(
+        "alphabetisation",
+        product.alphabetisation,
+        "2_clean/literacy_rates.parquet",
+    ),
+    _product_stage(
+        "unemployed",
+        product.unemployed,
+        "2_clean/youth_not_in_education_employment_or_training.parquet",
+    ),
+    _cube_stage(
+        [
+            "2_clean/education_attainment.parquet",
+            "2_clean/literacy_rates.parquet",
+            "2_clean/youth_not_in_education_employment_or_training.parquet",
+        ]
+    ),
+    _arrow_stage("education_attainment"),
+    _arrow_stage("alphabetisation"),
+    _arrow_stage("unemployed"),
+    Stage(
+        "shapes/eez",
+        [shapes.RAW_EEZ, shapes.TERRITORIES],
+        [geometry.SOURCE],
+        lambda data_dir: shapes.build_eez(data_dir),
+    ),
+    Stage(
+        "shapes/levels",
+        [geometry.SOURCE],
+        [geometry.INDEX, *(geometry.level_path(level) for level in geometry.LEVELS)],
+        lambda data_dir: shapes.build_levels(data_dir),
+    ),
+]
+
+
+def _hashes(data_dir: Path, files: list[str]) -> dict[str, str | None]:
+    return {
+        relative: (
+            file_hash(data_dir / relative) if (data_dir / relative).exists() else None
+        )
+        for relative in files
+    }
+
+
+def _read_state(data_dir: Path) -> dict:
+    path = data_dir / STATE
+    return json.loads(path.read_text()) if path.exists() else {}
+
+
+def run_pipeline(
+    data_dir: Path = config.DATA_DIR,
+    stages: list[Stage] = STAGES,
+    only: list[str] = None,
+    force: bool = False,
+) -> list[StageReport]:
+    """
+    Run the stages, in order, whose inputs or outputs changed since their last
+    run. Stages read the outputs of the previous ones, so a changed raw file
+    also re-runs every stage depending on it.
+    """
+    data_dir = Path(data_dir)
+    state = _read_state(data_dir)
+    reports = []
+
+    for stage in stages:
+        if only and stage.name not in only:
+            continue
+        inputs = _hashes(data_dir, stage.inputs)
+        missing = [relative for relative, digest in inputs.items() if digest is None]
+        if missing:
+            raise FileNotFoundError(f"{stage.name}: missing input {missing}")
+
+        previous = state.get(stage.name, {})
+        recorded = {**previous.get("inputs", {}), **previous.get("outputs", {})}
+        current = {**inputs, **_hashes(data_dir, stage.outputs)}
+        # A missing output is out of date even if it was never recorded.
+        changed = [
+            relative
+            for relative, digest in current.items()
+            if digest is None or recorded.get(relative) != digest
+        ]
+        if not changed and not force:
+            reports.append(StageReport(stage.name, "up to date"))
+            continue
+
+        tic = time.perf_counter()
+        for relative in stage.outputs:
+            (data_dir / relative).parent.mkdir(parents=True, exist_ok=True)
+        stage.run(data_dir)
+        seconds = time.perf_counter() - tic
+        logger.info("%s ran in %.3fs (changed: %s)", stage.name, seconds, changed)
+
+        state[stage.name] = {
+            "inputs": inputs,
+            "outputs": _hashes(data_dir, stage.outputs),
+        }
+        reports.append(StageReport(stage.name, "ran", seconds, changed))
+
+    (data_dir / STATE).write_text(json.dumps(state, indent=2, sort_keys=True) + "\n")
+    write_manifest(data_dir)
+    return reports
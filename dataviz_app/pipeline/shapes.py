@@ -0,0 +1,256 @@
+"""
+Map geometry: one EEZ geometry per territory, and its simplified levels.
+
+`build_eez` dissolves the raw EEZ boundaries (one row per zone, as published by
+marineregions.org) into the territories of the mapping in `TERRITORIES`:
+
+    {
+      "region": [[min_x, min_y, max_x, max_y], ...],
+      "territories": [
+        {"pacific_island": ..., "ile_du_pacifique": ..., "match": {column: [values]}},
+        ...
+      ]
+    }
+
+A boundary belongs to the first territory having one of its values in a matched
+column (e.g. `Territory1`, or `Sovereign1` to merge every zone of a country).
+Only the boundaries intersecting the region (optional, in degrees) are read, so
+the same code builds a subset of the global EEZ dataset. Its boxes may extend
+beyond 180° to cross the antimeridian: they match the raw files in -180..180 as
+well as in 0..360 longitudes. Every boundary of a territory must intersect the
+region, or the build fails instead of dissolving the territory partially.
+"""
+
+import argparse
+import json
+import logging
+import time
+from pathlib import Path
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import shapely
+
+from dataviz_app import config
+from dataviz_app.geometry import (
+    INDEX,
+    LEVELS,
+    LEVELS_DIR,
+    SOURCE,
+    level_path,
+    select_level,
+)
+
+logger = logging.getLogger(__name__)
+
+RAW_EEZ = "shapes/1_raw/country_boundary_eez.geojson"
+TERRITORIES = "shapes/territories.json"
+NAMES = ["pacific_island", "ile_du_pacifique"]
+
+
+def _boxes(region: list[list[float]]) -> list[shapely.Polygon]:
+    """Boxes of the region, and their parts beyond ±180° shifted by 360°."""
+    boxes = []
+    for min_x, min_y, max_x, max_y in region:
+        boxes.append(shapely.box(min_x, min_y, max_x, max_y))
+        if max_x > 180:
+            boxes.append(shapely.box(-180, min_y, max_x - 360, max_y))
+        if min_x < -180:
+            boxes.append(shapely.box(min_x + 360, min_y, 180, max_y))
+    return boxes
+
+
+def read_eez(path: Path, region: list[list[float]] = None) -> gpd.GeoDataFrame:
+    # A spatial filter of OGR: boundaries outside the region are never turned
+    # into geometries, and formats with a spatial index (shapefile, GeoPackage)
+    # skip them without reading them.
+    mask = None
+    if region:
+        mask = shapely.union_all(_boxes(region))
+    eez = gpd.read_file(path, mask=mask)
+    if eez.crs is not None and eez.crs.to_epsg() != 4326:
+        eez = eez.to_crs(4326)
+    return eez
+
+
+def match_territories(eez: pd.DataFrame, territories: list[dict]) -> np.ndarray:
+    """Position in `territories` of the territory of each boundary, -1 if none."""
+    unmatched = len(territories)
+    codes = np.full(len(eez), unmatched)
+    columns = {column for territory in territories for column in territory["match"]}
+    for column in sorted(columns):
+        # First territory of each value: one hash lookup per boundary.
+        lookup = {}
+        for position, territory in enumerate(territories):
+            for value in territory["match"].get(column, []):
+                lookup.setdefault(value, position)
+        matched = eez[column].map(lookup).fillna(unmatched).to_numpy(int)
+        codes = np.minimum(codes, matched)
+    return np.where(codes == unmatched, -1, codes)
+
+
+def check_region(path: Path, territories: list[dict], found: np.ndarray) -> list[str]:
+    """Territories with boundaries outside the region (`found` were read)."""
+    # Only the attributes: no geometry is built.
+    attributes = gpd.read_file(path, ignore_geometry=True)
+    codes = match_territories(attributes, territories)
+    total = np.bincount(codes[codes >= 0], minlength=len(territories))
+    return [
+        territory["pacific_island"]
+        for territory, count, expected in zip(territories, found, total)
+        if count < expected
+    ]
+
+
+def dissolve(geometries: np.ndarray, codes: np.ndarray, count: int) -> np.ndarray:
+    """Union of the geometries of each code in `range(count)`."""
+    order = np.argsort(codes, kind="stable")
+    bounds = np.searchsorted(codes[order], np.arange(count + 1))
+    return np.array(
+        [
+            shapely.union_all(geometries[order[start:end]])
+            for start, end in zip(bounds[:-1], bounds[1:])
+        ],
+        dtype=object,
+    )
+
+
+def build_eez(
+    data_dir: Path = config.DATA_DIR, source: str = RAW_EEZ, mapping: str = TERRITORIES
+) -> dict[str, float]:
+    """
+    Write one EEZ geometry per territory of `mapping` to `SOURCE`.
+    Returns the seconds spent reading, matching, dissolving and writing.
+    """
+    data_dir = Path(data_dir)
+    mapping = json.loads((data_dir / mapping).read_text())
+    territories = mapping["territories"]
+    timings = {}
+
+    tic = time.perf_counter()
+    eez = read_eez(data_dir / source, mapping.get("region"))
+    timings["read"] = time.perf_counter() - tic
+
+    tic = time.perf_counter()
+    codes = match_territories(eez, territories)
+    found = np.bincount(codes[codes >= 0], minlength=len(territories))
+    missing = [
+        territory["pacific_island"]
+        for territory, count in zip(territories, found)
+        if not count
+    ]
+    if missing:
+        raise ValueError(f"No EEZ boundary matches the territories {missing}")
+    timings["match"] = time.perf_counter() - tic
+
+    if mapping.get("region"):
+        tic = time.perf_counter()
+        outside = check_region(data_dir / source, territories, found)
+        if outside:
+            raise ValueError(
+                f"The region leaves out EEZ boundaries of the territories {outside}"
+            )
+        timings["check"] = time.perf_counter() - tic
+
+    tic = time.perf_counter()
+    matched = codes >= 0
+    dissolved = dissolve(eez.geometry.values[matched], codes[matched], len(territories))
+    timings["dissolve"] = time.perf_counter() - tic
+
+    tic = time.perf_counter()
+    pacific_eez = gpd.GeoDataFrame(
+        {name: [territory[name] for territory in territories] for name in NAMES},
+        geometry=dissolved,
+    )
+    # GeoJSON coordinates are always WGS 84: the file has no crs member.
+    pacific_eez.to_file(data_dir / SOURCE, driver="GeoJSON", index=True)
+    timings["write"] = time.perf_counter() - tic
+
+    logger.info(
+        "Dissolved %s of %s EEZ boundaries into %s territories (%s)",
+        int(matched.sum()),
+        len(eez),
+        len(territories),
+        ", ".join(f"{stage} {seconds:.3f}s" for stage, seconds in timings.items()),
+    )
+    return timings
+
+
+def count_vertices(geometries: gpd.GeoSeries) -> int:
+    return int(shapely.get_num_coordinates(geometries.values).sum())
+
+
+def simplify(pacific_eez: gpd.GeoDataFrame, tolerance: float) -> gpd.GeoDataFrame:
+    if not tolerance:
+        return pacific_eez
+    simplified = pacific_eez.copy()
+    # preserve_topology keeps every polygon valid (no self-intersection and no
+    # collapsed ring) whatever the tolerance.
+    simplified["geometry"] = pacific_eez.geometry.simplify(
+        tolerance, preserve_topology=True
+    )
+    return simplified
+
+
+def map_level(pacific_eez: gpd.GeoDataFrame) -> dict:
+    """Territory names and choropleth GeoJSON (feature ids are the names)."""
+    return {
+        "territories": {
+            column: pacific_eez[column].tolist()
+            for column in ["pacific_island", "ile_du_pacifique"]
+        },
+        "geojson": pacific_eez.set_index("pacific_island").geometry.__geo_interface__,
+    }
+
+
+def build_levels(
+    data_dir: Path = config.DATA_DIR, levels: dict = LEVELS
+) -> dict[str, dict]:
+    """Write one map file per level and an index describing them."""
+    data_dir = Path(data_dir)
+    pacific_eez = gpd.read_file(data_dir / SOURCE).drop(columns=["index"])
+    (data_dir / LEVELS_DIR).mkdir(parents=True, exist_ok=True)
+
+    index = {}
+    for level, tolerance in levels.items():
+        simplified = simplify(pacific_eez, tolerance)
+        content = json.dumps(map_level(simplified))
+        (data_dir / level_path(level)).write_text(content)
+        index[level] = {
+            "path": level_path(level),
+            "tolerance": tolerance,
+            "vertices": count_vertices(simplified.geometry),
+            "bytes": len(content.encode()),
+        }
+    (data_dir / INDEX).write_text(json.dumps(index, indent=2) + "\n")
+    return index
+
+
+if __name__ == "__main__":
+    from dataviz_app.data import write_manifest
+
+    parser = argparse.ArgumentParser(
+        description="Dissolve the EEZ of each territory and build the simplified "
+        "versions of the geometry."
+    )
+    parser.add_argument("--max-bytes", type=int, default=config.MAP_MAX_BYTES)
+    parser.add_argument("--max-vertices", type=int, default=config.MAP_MAX_VERTICES)
+    args = parser.parse_args()
+
+    timings = build_eez()
+    index = build_levels()
+    write_manifest()
+    selected = select_level(index, args.max_bytes, args.max_vertices)
+
+    print(f"{'eez stage':<9} {'seconds':>8}")
+    for stage, seconds in timings.items():
+        print(f"{stage:<9} {seconds:>8.3f}")
+    print()
+    print(f"{'level':<8} {'tolerance':>9} {'vertices':>9} {'bytes':>9}")
+    for level, info in index.items():
+        mark = " <- served" if level == selected else ""
+        print(
+            f"{level:<8} {info['tolerance']:>9} {info['vertices']:>9} "
+            f"{info['bytes']:>9}{mark}"
+        )
@@ -0,0 +1,177 @@
+"""
+Territory blocks rendered ahead of time.
+
+The chart block of a territory only depends on the data version and the code
+rendering it. Every block (each territory, for every year and each year of the
+cube) is rendered once to the JSON Dash sends, in a directory named after a
+fingerprint of the data version and the code, so a cold callback reads a file
+instead of building the figures. The application builds the directory when it
+prepares a data version whose directory is missing, i.e. after the data or the
+code changed, and then removes the directories older than the previous one:
+
+    python -m dataviz_app.prerender [--force]   # build it ahead of the deployment
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+import dash
+import dash_bootstrap_components as dbc
+import numpy as np
+import pandas as pd
+import plotly
+from plotly.io.json import to_json_plotly
+
+from dataviz_app import config
+from dataviz_app.component.country_charts import _helper_chart_by_country
+from dataviz_app.cube import ALL_YEARS
+from dataviz_app.query import IndicatorQuery
+
+logger = logging.getLogger(__name__)
+
+INDEX = "index.json"
+PACKAGE_DIR = Path(__file__).resolve().parent
+# Block directories kept: the one just built and the previous one, still read by
+# the workers that did not switch to the new data version yet.
+KEEP = 2
+# Libraries whose version changes the JSON of the blocks (components, figures,
+# default templates, number formatting).
+LIBRARIES = {"dash": dash, "dbc": dbc, "plotly": plotly, "numpy": np, "pandas": pd}
+
+
+def fingerprint(version: str) -> str:
+    """Hash of the data version, the code, the libraries and the settings."""
+    digest = hashlib.sha256(f"data: {version}\n".encode())
+    for path in sorted(PACKAGE_DIR.rglob("*.py")):
+        digest.update(path.relative_to(PACKAGE_DIR).as_posix().encode())
+        digest.update(path.read_bytes())
+    for name, module in LIBRARIES.items():
+        digest.update(f"{name}: {module.__version__}\n".encode())
+    digest.update(f"pruned templates: {config.PRUNED_TEMPLATES}".encode())
+    return digest.hexdigest()[:16]
+
+
+class PrerenderedBlocks:
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        index = json.loads((self.directory / INDEX).read_text())
+        self.files = {(country, year): name for country, year, name in index}
+
+    def get(self, country: str, year: int | str) -> dict | None:
+        """Block as sent to the browser, or None if it was not rendered."""
+        try:
+            name = self.files.get((country, year))
+        except TypeError:  # Not a year.
+            return None
+        if name is None:
+            return None
+        try:
+            return json.loads((self.directory / name).read_bytes())
+        except OSError:
+            logger.warning("Prerendered block %s is missing.", self.directory / name)
+            return None
+
+
+def build(
+    query: IndicatorQuery,
+    version: str,
+    directory: Path,
+    key: str,
+    replace: bool = False,
+) -> Path:
+    """
+    Render every block into `directory`/`key`. The files are written to a
+    temporary directory renamed at the end, so that processes building at the
+    same time never read a partial directory. With `replace`, an existing
+    directory is swapped for the new one instead of kept.
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    target = directory / key
+    building = Path(tempfile.mkdtemp(prefix=f".{key}-", dir=directory))
+
+    index = []
+    for position, country in enumerate(query.territories):
+        for year in [ALL_YEARS, *query.years]:
+            block = _helper_chart_by_country(
+                country, query.territory(country, year), year, version
+            )
+            name = f"{position}_{year}.json"
+            (building / name).write_text(to_json_plotly(block))
+            index.append([country, year, name])
+    (building / INDEX).write_text(json.dumps(index))
+
+    if replace and target.exists():
+        old = Path(tempfile.mkdtemp(prefix=f".{key}-old-", dir=directory))
+        target.rename(old)
+        building.rename(target)
+        shutil.rmtree(old, ignore_errors=True)
+        return target
+    try:
+        building.rename(target)
+    except OSError:
+        # Built by another process in the meantime.
+        shutil.rmtree(building)
+    return target
+
+
+def _remove_old(directory: Path, keep: int = KEEP) -> None:
+    """Remove the block directories older than the `keep` last built."""
+    built = []
+    for index in Path(directory).glob(f"*/{INDEX}"):
+        if index.parent.name.startswith("."):
+            continue  # Being built or replaced.
+        try:
+            built.append((index.stat().st_mtime, index.parent))
+        except OSError:
+            continue  # Removed by another process.
+    for _, path in sorted(built, reverse=True)[keep:]:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+def prerendered_blocks(
+    query: IndicatorQuery,
+    version: str,
+    directory: Path = config.PRERENDER_DIR,
+    force: bool = False,
+) -> PrerenderedBlocks:
+    """Blocks rendered for the data version and the code, built first if missing."""
+    key = fingerprint(version)
+    target = Path(directory) / key
+    if force or not (target / INDEX).exists():
+        tic = time.perf_counter()
+        build(query, version, directory, key, replace=force)
+        _remove_old(directory)
+        logger.info(
+            "Prerendered the territory blocks in %s in %.3fs",
+            target,
+            time.perf_counter() - tic,
+        )
+    return PrerenderedBlocks(target)
+
+
+if __name__ == "__main__":
+    from dataviz_app.data import load_app_data
+    from dataviz_app.registry import DataVersion
+
+    parser = argparse.ArgumentParser(description="Prerender the territory blocks.")
+    parser.add_argument(
+        "--force", action="store_true", help="Render them even if up to date."
+    )
+    args = parser.parse_args()
+
+    version = DataVersion.of(load_app_data())
+    tic = time.perf_counter()
+    blocks = prerendered_blocks(version.query, version.key, force=args.force)
+    seconds = time.perf_counter() - tic
+    size = sum(path.stat().st_size for path in blocks.directory.iterdir())
+    print(
+        f"{len(blocks.files)} blocks, {size / 1024:.0f} KiB in {blocks.directory} "
+        f"({seconds:.2f}s)"
+    )
@@ -0,0 +1,77 @@
+"""
+Indicators of the selected territories, as plotted by the components.
+
+Every component reads the tables through `IndicatorQuery`: the indicators of one
+territory are its rows of each table, the indicators of a selection are the
+means of its territories (`GroupedMean`), for the product tables or for one year
+of the cube. Results are cached, keyed by the territory index they come from.
+"""
+
+from dataclasses import dataclass
+from functools import lru_cache
+
+import pandas as pd
+
+from dataviz_app import config
+from dataviz_app.aggregation import GroupedMean
+from dataviz_app.cube import ALL_YEARS, YearCube, indexes_by_year
+from dataviz_app.territory_index import TerritoryIndex
+
+TABLES = ["education", "unemployed", "alphabetisation"]
+
+
+@dataclass(frozen=True)
+class Indicators:
+    """Shares by level and gender, NEET shares by sex, literacy rates (one row)."""
+
+    education: pd.DataFrame
+    unemployed: pd.DataFrame
+    alphabetisation: pd.DataFrame
+
+
+class IndicatorQuery:
+    def __init__(
+        self,
+        territory_index: TerritoryIndex,
+        cube: YearCube = None,
+        cache_size: int = config.QUERY_CACHE_SIZE,
+    ):
+        self.territory_index = territory_index
+        self.year_index = indexes_by_year(territory_index, cube)
+        self.years = cube.years if cube is not None else []
+        self._territory = lru_cache(maxsize=cache_size)(self._territory)
+        self._mean = lru_cache(maxsize=cache_size)(self._mean)
+        self._means = lru_cache(maxsize=None)(self._means)
+        self._means(territory_index)
+
+    @property
+    def territories(self) -> pd.Index:
+        """Every territory, in the order of the map first."""
+        return self.territory_index.territories
+
+    def territory(self, country: str, year: int | str = ALL_YEARS) -> Indicators:
+        return self._territory(country, self.year_index(year))
+
+    def mean(self, countries: list[str], year: int | str = ALL_YEARS) -> Indicators:
+        return self._mean(tuple(countries), self.year_index(year))
+
+    def _territory(self, country: str, index: TerritoryIndex) -> Indicators:
+        return Indicators(**{table: index.take(table, country) for table in TABLES})
+
+    def _mean(self, countries: tuple[str], index: TerritoryIndex) -> Indicators:
+        means = self._means(index)
+        return Indicators(
+            **{table: means[table].mean(list(countries)) for table in TABLES}
+        )
+
+    def _means(self, index: TerritoryIndex) -> dict[str, GroupedMean]:
+        # One row per displayed value.
+        return {
+            "education": GroupedMean(
+                index, "education", ["Niveau d'éducation", "Genre"], ["Ratio"]
+            ),
+            "unemployed": GroupedMean(index, "unemployed", ["Sexe"], ["Pourcentage"]),
+            "alphabetisation": GroupedMean(
+                index, "alphabetisation", [], ["Homme", "Femme"]
+            ),
+        }
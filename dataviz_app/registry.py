@@ -0,0 +1,141 @@
+"""
+Versions of the application data.
+
+A `DataVersion` holds the data loaded from the files and everything derived from
+it (indexes, query caches, prerendered blocks). Callbacks take
+`DataRegistry.current` once and only read that version, so a request never mixes
+two versions. When the data files change, the registry loads and prepares the
+new version in a background thread, then replaces the current one with a single
+assignment: the caches of the old version go away with it.
+"""
+
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from functools import cached_property
+from pathlib import Path
+from typing import Callable
+
+from dataviz_app import config, selection
+from dataviz_app.data import APP_FILES, MANIFEST, AppData, load_app_data
+from dataviz_app.query import IndicatorQuery
+from dataviz_app.territory_index import TerritoryIndex
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, eq=False)
+class DataVersion:
+    key: str
+    app_data: AppData
+    query: IndicatorQuery
+    # Block of a territory and year rendered ahead of time, or None.
+    prerendered: Callable[[str, int | str], dict | None] = None
+
+    @classmethod
+    def of(cls, app_data: AppData) -> "DataVersion":
+        territory_index = TerritoryIndex(
+            {
+                "education": app_data.education,
+                "unemployed": app_data.unemployed,
+                "alphabetisation": app_data.alphabetisation,
+            },
+            territories=app_data.territories["pacific_island"],
+        )
+        query = IndicatorQuery(territory_index, app_data.cube)
+        return cls(app_data.version, app_data, query)
+
+    @cached_property
+    def order(self) -> str:
+        """Key of the map order of the territories, sent with the selection."""
+        return selection.order_key(self.app_data.territories["pacific_island"])
+
+
+class DataRegistry:
+    def __init__(
+        self,
+        build: Callable[[AppData], DataVersion] = DataVersion.of,
+        data_dir: Path = config.DATA_DIR,
+        interval: float = config.RELOAD_INTERVAL,
+        version: DataVersion = None,
+    ):
+        """
+        `build` prepares a version from loaded data. The first version is
+        `version`, or loaded from `data_dir` now.
+        """
+        self.build = build
+        self.data_dir = Path(data_dir)
+        self.interval = interval
+        self._signature = self._stat()
+        self.current = version or build(load_app_data(self.data_dir))
+        self._reload_lock = threading.Lock()
+        self._watch_lock = threading.Lock()
+        self._watcher_pid = None
+
+    def _stat(self) -> tuple:
+        # Changes when a file is written, replaced or removed.
+        signature = []
+        for relative in [MANIFEST, *APP_FILES]:
+            try:
+                stat = (self.data_dir / relative).stat()
+                signature.append((stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                signature.append(None)
+        return tuple(signature)
+
+    def reload(self) -> bool:
+        """Load the data files if they changed; True if the version changed."""
+        with self._reload_lock:
+            signature = self._stat()
+            if signature == self._signature:
+                return False
+            # Tried once per change of the files: a failed load is retried when
+            # the files change again (e.g. the manifest is written last).
+            self._signature = signature
+            app_data = load_app_data(self.data_dir)
+            if self._stat() != signature:
+                # Written while being read: load again at the next check.
+                self._signature = None
+                return False
+            if app_data.version == self.current.key:
+                return False
+
+            tic = time.perf_counter()
+            version = self.build(app_data)
+            previous, self.current = self.current, version
+            logger.info(
+                "Data version %s replaced %s (prepared in %.3fs)",
+                version.key,
+                previous.key,
+                time.perf_counter() - tic,
+            )
+            return True
+
+    def watch(self) -> None:
+        """
+        Check the data files every `interval` seconds in a thread of this
+        process. Called on each request: threads do not survive a fork, so each
+        worker starts its own, and the master of a preloading server none.
+        """
+        if self.interval <= 0 or self._watcher_pid == os.getpid():
+            return
+        with self._watch_lock:
+            if self._watcher_pid == os.getpid():
+                return
+            self._watcher_pid = os.getpid()
+            threading.Thread(
+                target=self._watch, name="data-watcher", daemon=True
+            ).start()
+
+    def _watch(self) -> None:
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.reload()
+            except Exception:
+                logger.exception(
+                    "Could not load the new data, keeping version %s.",
+                    self.current.key,
+                )
@@ -0,0 +1,65 @@
+"""
+Selected territories, as kept in the browser by the `id.STORE` store.
+
+The store holds the sorted positions of the selected territories in the order
+of the map, which is also the beginning of `TerritoryIndex.territories`, next to
+the key of this order: `{"order": key, "positions": [...]}`. Its size only
+depends on the number of selected territories, and a click on the map toggles
+the `pointIndex` of the clicked feature. A page loaded before a reload of the
+data that changed the territories or their order holds another key: its
+selection is dropped instead of decoded against the new order.
+"""
+
+import hashlib
+from typing import Iterable, Sequence
+
+
+def order_key(order: Iterable[str]) -> str:
+    """Key of an order of the territories."""
+    return hashlib.sha256("\n".join(order).encode()).hexdigest()[:12]
+
+
+def empty(key: str) -> dict:
+    return {"order": key, "positions": []}
+
+
+def same_order(selection: dict, key: str) -> bool:
+    """Whether a selection sent by the browser was made in the order `key`."""
+    return isinstance(selection, dict) and selection.get("order") == key
+
+
+def positions(selection: dict, size: int, key: str) -> list[int]:
+    """
+    Valid positions of a selection sent by the browser, sorted, once each. Empty
+    if the selection was made in another order than `key`.
+    """
+    if not same_order(selection, key):
+        return []
+    return sorted(
+        {
+            i
+            for i in selection.get("positions") or []
+            # Not bool, a subclass of int.
+            if type(i) is int and 0 <= i < size
+        }
+    )
+
+
+def encode(order: Sequence[str], territories: Iterable[str], key: str) -> dict:
+    selected = set(territories)
+    return {
+        "order": key,
+        "positions": [i for i, territory in enumerate(order) if territory in selected],
+    }
+
+
+def decode(selection: dict, order: Sequence[str], key: str) -> list[str]:
+    return [order[i] for i in positions(selection, len(order), key)]
+
+
+def flags(selected: list[int], size: int) -> list[int]:
+    """1 for each of the valid positions `selected`, 0 otherwise."""
+    values = [0] * size
+    for i in selected:
+        values[i] = 1
+    return values
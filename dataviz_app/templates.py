@@ -0,0 +1,66 @@
+"""
+Plotly templates reduced to what the application's figures use.
+
+Every figure carries its template in its JSON, and plotly.js has no registry
+of named templates to refer to instead. The built-in templates style every
+trace type and subplot (3D scenes, polar, ternary, maps, colorscales...): the
+copies registered here keep only the trace types and layout attributes that
+apply to the charts of the application, so they render the same for a fraction
+of the payload.
+"""
+
+import plotly.graph_objects as go
+import plotly.io as pio
+
+from dataviz_app import config
+
+# Plotly template -> trace types and layout attributes kept.
+USED = {
+    "plotly_dark": (
+        ["bar", "pie"],
+        [
+            "autotypenumbers",
+            "colorway",
+            "font",
+            "hovermode",
+            "hoverlabel",
+            "paper_bgcolor",
+            "plot_bgcolor",
+            "title",
+            "xaxis",
+            "yaxis",
+        ],
+    ),
+    "plotly": (
+        ["choropleth"],
+        [
+            "autotypenumbers",
+            "colorway",
+            "font",
+            "hovermode",
+            "hoverlabel",
+            "paper_bgcolor",
+            "plot_bgcolor",
+            "title",
+            "geo",
+        ],
+    ),
+}
+
+
+def _pruned(name: str) -> go.layout.Template:
+    traces, layout = USED[name]
+    template = pio.templates[name].to_plotly_json()
+    return go.layout.Template(
+        data={t: template["data"][t] for t in traces if t in template["data"]},
+        layout={k: template["layout"][k] for k in layout if k in template["layout"]},
+    )
+
+
+for _name in USED:
+    pio.templates[f"dataviz_{_name}"] = _pruned(_name)
+
+
+def template(name: str) -> str:
+    """Name of the template to use in place of the plotly template `name`."""
+    return f"dataviz_{name}" if config.PRUNED_TEMPLATES else name
@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+
+TERRITORY = "Pays et territoires insulaires du Pacifique"
+
+
+class TerritoryIndex:
+    """
+    Row positions of every territory in every table.
+
+    Territories are encoded once as categorical codes shared by all the tables,
+    so selecting the rows of a territory is a dictionary lookup followed by
+    `iloc` instead of a string comparison over the whole column.
+    """
+
+    def __init__(self, tables: dict[str, pd.DataFrame], territories: list[str] = ()):
+        self.tables = tables
+
+        # Known order first (the map), then the territories only found in tables.
+        names = list(dict.fromkeys(territories))
+        for frame in tables.values():
+            names += [t for t in frame[TERRITORY].unique() if t not in names]
+        self.territories = pd.Index(names, name=TERRITORY)
+
+        self.codes = {}
+        self.rows = {}
+        for name, frame in tables.items():
+            codes = pd.Categorical(frame[TERRITORY], categories=self.territories).codes
+            order = np.argsort(codes, kind="stable")
+            bounds = np.cumsum(np.bincount(codes, minlength=len(self.territories)))
+            self.codes[name] = codes
+            self.rows[name] = dict(zip(self.territories, np.split(order, bounds[:-1])))
+
+    def __getitem__(self, table: str) -> pd.DataFrame:
+        return self.tables[table]
+
+    def positions(self, table: str, territories: str | list[str]) -> np.ndarray:
+        if isinstance(territories, str):
+            return self.rows[table].get(territories, np.array([], dtype=int))
+        rows = [self.rows[table][t] for t in territories if t in self.rows[table]]
+        # Keep the order of the table, as a boolean filter would.
+        return np.sort(np.concatenate(rows)) if rows else np.array([], dtype=int)
+
+    def take(self, table: str, territories: str | list[str]) -> pd.DataFrame:
+        return self.tables[table].iloc[self.positions(table, territories)]
+
+    def mask(self, territories: list[str]) -> np.ndarray:
+        return self.territories.isin(territories)
@@ -0,0 +1,25 @@
+"""
+Production server settings:
+
+    gunicorn -c gunicorn.conf.py dataviz_app.app:server
+
+The application (libraries, data and precomputed indexes) is imported once by
+the master process and the workers are forked from it, so they share its memory
+pages instead of loading their own copy. The product tables are memory-mapped
+from their Arrow IPC copies.
+"""
+
+import gc
+import os
+
+os.environ.setdefault("DATAVIZ_DATA_FORMAT", "arrow")
+
+bind = os.environ.get("DATAVIZ_BIND", f"0.0.0.0:{os.environ.get('PORT', '8050')}")
+workers = int(os.environ.get("DATAVIZ_WORKERS", "2"))
+preload_app = os.environ.get("DATAVIZ_PRELOAD", "1") == "1"
+
+
+def when_ready(server):
+    # Objects loaded by the master are left out of the workers' garbage
+    # collections, which would otherwise write to their pages and copy them.
+    gc.freeze()